@@ -14,20 +14,41 @@ import json
 import os
 import re
 import time
+from functools import lru_cache
 from typing import AsyncGenerator
 
 import anthropic
 
+from app.background import spawn_background
+from app.cache import SessionCache
+from app.config import get_settings
+from app.database import get_clone, save_clone, sync_files_to_supabase, update_clone
 from app.sse_utils import sse_event
 from app.scraper import scrape_website
-from app.sandbox import PROJECT_PATH, BUN_BIN, get_daytona_client, create_react_boilerplate_sandbox
+from app.sandbox import PROJECT_PATH, BUN_BIN, get_daytona_client, create_react_boilerplate_sandbox, stop_sandbox
 from app.sandbox_template import upload_files_to_sandbox, get_sandbox_logs
 
 
 OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "output")
 
-# In-memory chat session storage (clone_id → session data)
-_chat_sessions: dict = {}
+def _on_session_evicted(key: str, session: dict):
+    """Persist an evicted session's files so edits survive eviction."""
+    clone_id = (session.get("state") or {}).get("clone_id")
+    files = session.get("files")
+    if not clone_id or not files:
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    print(f"[sessions] Evicting {clone_id[:12]} — writing files back to Supabase")
+    spawn_background(sync_files_to_supabase(clone_id, files), "sessions")
+
+
+# In-memory chat session storage (clone_id → session data).
+# Bounded so long-running servers don't accumulate every clone's files;
+# evicted sessions are written back and restored from Supabase on demand.
+_chat_sessions = SessionCache(maxsize=500, ttl=2 * 60 * 60, on_evict=_on_session_evicted)
 
 # Active sandbox tracking (sandbox_id → sandbox info)
 active_sandboxes: dict = {}
@@ -38,16 +59,72 @@ CLAUDE_MODEL = "claude-sonnet-4-5-20250929"
 # Sandbox auto-stop after N minutes of inactivity
 SANDBOX_TTL_MINUTES = 30
 
+# Substrings that unambiguously signal a runtime error page (see _check_sandbox_http)
+_ERROR_INDICATORS = (
+    "Application error: a client-side exception",
+    "Application error: a server-side exception",
+    "Unhandled Runtime Error",
+    "Internal Server Error",
+    "Error: Minified React error",
+    "nextjs__container_errors__",
+)
+
+# Compiled once — these run on every HTTP check, generation and fix attempt.
+# Error messages in the Next.js error overlay HTML
+_OVERLAY_ERROR_RES = tuple(
+    re.compile(p, re.DOTALL | re.IGNORECASE) for p in (
+        r'<div[^>]*nextjs__container_errors__[^>]*>(.*?)</div>',
+        r'<h2[^>]*>((?:Error|TypeError|ReferenceError|SyntaxError)[^<]*)</h2>',
+        r'<p[^>]*>((?:Error|TypeError|ReferenceError|Cannot)[^<]{10,300})</p>',
+        r'(?:Error|TypeError|ReferenceError|RangeError):\s*([^\n<]{10,300})',
+    )
+)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+# "filepath": " openings in truncated generation JSON
+_FILE_ENTRY_RE = re.compile(r'"((?:app|components|lib)/[^"]+)":\s*"')
+# JSX sanitizing
+_JSX_CLASS_RE = re.compile(r'\bclass=(["\'{])')
+_JSX_FOR_RE = re.compile(r'\bfor=(["\'{}])')
+_FOR_ATTR_RE = re.compile(r'\bfor=["\']')
+_HTML_COMMENT_RE = re.compile(r'<!--\s*(.*?)\s*-->')
+_VOID_ELEMENT_RE = re.compile(r'<(br|hr|img|input|meta|link|source|area|col|embed|wbr)(\s[^>]*)?\s*(?<!/)>')
+# HTML entities → actual characters, replaced in one pass over the source
+_HTML_ENTITIES = {
+    '&nbsp;': ' ',
+    '&mdash;': '\u2014',
+    '&ndash;': '\u2013',
+    '&laquo;': '\u00AB',
+    '&raquo;': '\u00BB',
+    '&bull;': '\u2022',
+    '&hellip;': '\u2026',
+    '&copy;': '\u00A9',
+    '&reg;': '\u00AE',
+    '&trade;': '\u2122',
+}
+_HTML_ENTITY_RE = re.compile("|".join(map(re.escape, _HTML_ENTITIES)))
+_MODULE_NOT_FOUND_RE = re.compile(r"Module not found: Can't resolve ['\"]([^'\"]+)['\"]")
 
+
+@lru_cache()
 def _get_client():
-    """Get an async Anthropic client."""
+    """
+    Get the shared async Anthropic client.
+    Reused across calls so requests ride the client's pooled keep-alive
+    connections instead of paying a TCP+TLS handshake every time.
+    """
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
-        from app.config import get_settings
         api_key = get_settings().anthropic_api_key
     return anthropic.AsyncAnthropic(api_key=api_key)
 
 
+@lru_cache()
+def _get_genai_client(api_key: str):
+    """Get the shared Gemini client for the given key (built once per key)."""
+    from google import genai
+    return genai.Client(api_key=api_key)
+
+
 def _file_language(filepath: str) -> str:
     """Infer language label from file extension."""
     if filepath.endswith((".tsx", ".jsx")):
@@ -200,28 +277,13 @@ async def _check_sandbox_http(sandbox_id: str, wait_before: float = 3.0) -> dict
             # error page.  Avoid substrings that appear in normal Next.js
             # HTML (e.g. script chunk names like "next-error-*.js", or
             # hydration "digest=" attributes).
-            error_indicators = [
-                "Application error: a client-side exception",
-                "Application error: a server-side exception",
-                "Unhandled Runtime Error",
-                "Internal Server Error",
-                "Error: Minified React error",
-                "nextjs__container_errors__",
-            ]
-            for indicator in error_indicators:
-                if indicator in body:
-                    errors.append(indicator)
+            errors.extend(ind for ind in _ERROR_INDICATORS if ind in body)
 
             # Extract actual error messages from Next.js error overlay HTML
-            for pattern in [
-                r'<div[^>]*nextjs__container_errors__[^>]*>(.*?)</div>',
-                r'<h2[^>]*>((?:Error|TypeError|ReferenceError|SyntaxError)[^<]*)</h2>',
-                r'<p[^>]*>((?:Error|TypeError|ReferenceError|Cannot)[^<]{10,300})</p>',
-                r'(?:Error|TypeError|ReferenceError|RangeError):\s*([^\n<]{10,300})',
-            ]:
-                for m in re.finditer(pattern, body, re.DOTALL | re.IGNORECASE):
+            for pattern in _OVERLAY_ERROR_RES:
+                for m in pattern.finditer(body):
                     msg = m.group(1).strip()
-                    msg = re.sub(r'<[^>]+>', ' ', msg).strip()
+                    msg = _HTML_TAG_RE.sub(' ', msg).strip()
                     if msg and len(msg) > 5 and msg not in error_messages:
                         error_messages.append(msg[:300])
 
@@ -244,14 +306,20 @@ async def _check_sandbox_http(sandbox_id: str, wait_before: float = 3.0) -> dict
     return await asyncio.to_thread(_check)
 
 
+_FENCE = "```"
+
+
 def _strip_code_fences(text: str) -> str:
     """Remove markdown code fences from Claude output."""
     text = text.strip()
-    if text.startswith("```"):
-        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
-    if text.endswith("```"):
-        text = text[:-3]
-    return text.strip()
+    # Work out both cut points first so the body is sliced only once
+    start, end = 0, len(text)
+    if text.startswith(_FENCE):
+        nl = text.find("\n")
+        start = nl + 1 if nl != -1 else 3
+    if text.endswith(_FENCE) and end - 3 >= start:
+        end -= 3
+    return text[start:end].strip()
 
 
 # ---------------------------------------------------------------
@@ -273,14 +341,21 @@ async def _diagnose_and_fix(
         {"status": "errors_found", "diagnosis": "...", "fixed_files": {"path": "content", ...}}
         {"status": "error", "message": "..."}  (AI unavailable / parse failure)
     """
-    from app.config import get_settings
     api_key = get_settings().gemini_api_key or os.getenv("GEMINI_API_KEY", "")
 
     # Build file listing
-    file_listing = ""
+    # Only the first 25000 chars make it into the prompt, so stop collecting
+    # once that much is buffered instead of concatenating every file
+    parts = []
+    listed = 0
     for fp, content in source_files.items():
         if fp.endswith((".jsx", ".tsx", ".css", ".js")):
-            file_listing += f"\n=== {fp} ===\n{content}\n"
+            part = f"\n=== {fp} ===\n{content}\n"
+            parts.append(part)
+            listed += len(part)
+            if listed >= 25000:
+                break
+    file_listing = "".join(parts)
 
     prompt = (
         "You are debugging a Next.js 14 app (App Router, Tailwind CSS v4, JSX components).\n\n"
@@ -317,8 +392,7 @@ async def _diagnose_and_fix(
     if api_key:
         def _call_gemini():
             try:
-                from google import genai
-                client = genai.Client(api_key=api_key)
+                client = _get_genai_client(api_key)
                 response = client.models.generate_content(
                     model="gemini-2.5-pro",
                     contents=prompt,
@@ -604,8 +678,7 @@ def _extract_json_from_response(raw: str) -> dict:
         files = {}
         # Match "filepath": "content" pairs — the content may contain escaped quotes
         # Use a simpler approach: split on the pattern that starts a new file entry
-        file_pattern = re.compile(r'"((?:app|components|lib)/[^"]+)":\s*"')
-        matches = list(file_pattern.finditer(text))
+        matches = list(_FILE_ENTRY_RE.finditer(text))
         for i, m in enumerate(matches):
             filepath = m.group(1)
             content_start = m.end()
@@ -735,7 +808,7 @@ async def _generate_all(scrape_data: dict, on_progress=None) -> tuple[dict, int,
     if font_urls:
         structured["google_font_urls"] = font_urls
 
-    data_json = json.dumps(structured, indent=2, default=str)
+    data_json = json.dumps(structured, separators=(",", ":"), default=str)
     if len(data_json) > 30000:
         data_json = data_json[:30000] + "\n... (truncated)"
 
@@ -886,29 +959,20 @@ async def _generate_all(scrape_data: dict, on_progress=None) -> tuple[dict, int,
         original = src
 
         # class= → className=  (but not className= which is already correct)
-        src = re.sub(r'\bclass=(["\'{])', r'className=\1', src)
+        src = _JSX_CLASS_RE.sub(r'className=\1', src)
 
         # for= on labels → htmlFor=  (but not htmlFor= already)
-        src = re.sub(r'\bfor=(["\'{}])', r'htmlFor=\1', src)
+        src = _JSX_FOR_RE.sub(r'htmlFor=\1', src)
 
         # HTML comments → JSX comments
-        src = re.sub(r'<!--\s*(.*?)\s*-->', r'{/* \1 */}', src)
+        src = _HTML_COMMENT_RE.sub(r'{/* \1 */}', src)
 
         # Void elements without self-closing slash
-        src = re.sub(r'<(br|hr|img|input|meta|link|source|area|col|embed|wbr)(\s[^>]*)?\s*(?<!/)>',
-                     lambda m: f'<{m.group(1)}{m.group(2) or ""} />', src)
+        src = _VOID_ELEMENT_RE.sub(lambda m: f'<{m.group(1)}{m.group(2) or ""} />', src)
 
         # HTML entities → actual characters
-        src = src.replace('&nbsp;', ' ')
-        src = src.replace('&mdash;', '\u2014')
-        src = src.replace('&ndash;', '\u2013')
-        src = src.replace('&laquo;', '\u00AB')
-        src = src.replace('&raquo;', '\u00BB')
-        src = src.replace('&bull;', '\u2022')
-        src = src.replace('&hellip;', '\u2026')
-        src = src.replace('&copy;', '\u00A9')
-        src = src.replace('&reg;', '\u00AE')
-        src = src.replace('&trade;', '\u2122')
+        if '&' in src:
+            src = _HTML_ENTITY_RE.sub(lambda m: _HTML_ENTITIES[m.group(0)], src)
         # &amp; &lt; &gt; &quot; are trickier — only replace in text contexts,
         # not inside JSX expressions.  Simple heuristic: skip them to be safe.
 
@@ -917,7 +981,7 @@ async def _generate_all(scrape_data: dict, on_progress=None) -> tuple[dict, int,
             fixes_applied = []
             if 'class=' in original and 'class=' not in src:
                 fixes_applied.append('class→className')
-            if re.search(r'\bfor=["\']', original):
+            if _FOR_ATTR_RE.search(original):
                 fixes_applied.append('for→htmlFor')
             if '<!--' in original:
                 fixes_applied.append('HTML comments→JSX')
@@ -967,7 +1031,6 @@ async def run_clone_streaming(url: str) -> AsyncGenerator[str, None]:
 
     # Save to DB
     try:
-        from app.database import save_clone
         record = await save_clone({"url": url, "status": "processing", "output_format": "react"})
         state["clone_id"] = record.get("id")
         _log(f"DB: clone_id={state['clone_id']}")
@@ -998,53 +1061,65 @@ async def run_clone_streaming(url: str) -> AsyncGenerator[str, None]:
     scrape_data = None
     sandbox_info = None
 
-    while pending:
-        done, pending = await asyncio.wait(pending, timeout=0.5, return_when=asyncio.FIRST_COMPLETED)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=0.5, return_when=asyncio.FIRST_COMPLETED)
 
-        # Drain scrape progress events
-        while not scrape_progress_queue.empty():
-            msg = scrape_progress_queue.get_nowait()
-            yield sse_event("step", {"step": "scraping", "message": msg})
+            # Drain scrape progress events
+            while not scrape_progress_queue.empty():
+                msg = scrape_progress_queue.get_nowait()
+                yield sse_event("step", {"step": "scraping", "message": msg})
 
-        for task in done:
-            if task is sandbox_task:
-                try:
-                    sandbox_info = task.result()
-                except Exception as e:
-                    _log(f"Sandbox acquisition failed: {e}")
-                    # Cancel the other task and bail out
-                    for t in pending:
-                        t.cancel()
-                    yield sse_event("error", {"message": f"Sandbox failed: {e}"})
-                    yield sse_event("done", {"preview_url": None, "error": str(e)})
-                    return
-
-                state["sandbox_id"] = sandbox_info["sandbox_id"]
-                state["preview_url"] = sandbox_info["preview_url"]
-                state["project_root"] = sandbox_info.get("project_root", PROJECT_PATH)
-
-                active_sandboxes[sandbox_info["sandbox_id"]] = {
-                    **sandbox_info,
-                    "created_at": time.time(),
-                }
+            for task in done:
+                if task is sandbox_task:
+                    try:
+                        sandbox_info = task.result()
+                    except Exception as e:
+                        _log(f"Sandbox acquisition failed: {e}")
+                        # Cancel the other task and bail out
+                        for t in pending:
+                            t.cancel()
+                        yield sse_event("error", {"message": f"Sandbox failed: {e}"})
+                        yield sse_event("done", {"preview_url": None, "error": str(e)})
+                        return
 
-                _log(f"Sandbox ready: {sandbox_info['sandbox_id'][:12]} — {sandbox_info['preview_url']}")
+                    state["sandbox_id"] = sandbox_info["sandbox_id"]
+                    state["preview_url"] = sandbox_info["preview_url"]
+                    state["project_root"] = sandbox_info.get("project_root", PROJECT_PATH)
 
-                yield sse_event("deployed", {
-                    "preview_url": sandbox_info["preview_url"],
-                    "sandbox_id": sandbox_info["sandbox_id"],
-                })
+                    active_sandboxes[sandbox_info["sandbox_id"]] = {
+                        **sandbox_info,
+                        "created_at": time.time(),
+                    }
 
-            elif task is scrape_task:
-                try:
-                    scrape_data = task.result()
-                except Exception as e:
-                    _log(f"Scrape failed: {e}")
-                    for t in pending:
-                        t.cancel()
-                    yield sse_event("error", {"message": f"Scrape failed: {e}"})
-                    yield sse_event("done", {"preview_url": state.get("preview_url"), "error": str(e)})
-                    return
+                    _log(f"Sandbox ready: {sandbox_info['sandbox_id'][:12]} — {sandbox_info['preview_url']}")
+
+                    yield sse_event("deployed", {
+                        "preview_url": sandbox_info["preview_url"],
+                        "sandbox_id": sandbox_info["sandbox_id"],
+                    })
+
+                elif task is scrape_task:
+                    try:
+                        scrape_data = task.result()
+                    except Exception as e:
+                        _log(f"Scrape failed: {e}")
+                        # Cancelling mid-provisioning would orphan the sandbox
+                        # its worker thread is still creating — reclaim it instead
+                        if sandbox_task in pending:
+                            spawn_background(_discard_sandbox(sandbox_task), "clone")
+                        yield sse_event("error", {"message": f"Scrape failed: {e}"})
+                        yield sse_event("done", {"preview_url": state.get("preview_url"), "error": str(e)})
+                        return
+    except (asyncio.CancelledError, GeneratorExit):
+        # Aborted (caller timed out or closed the stream) before `deployed`:
+        # no consumer knows this sandbox, so reclaim it here once provisioning
+        # finishes. It runs in a worker thread, so cancelling it wouldn't stop
+        # the sandbox from being created.
+        scrape_task.cancel()
+        if state["sandbox_id"] is None:
+            spawn_background(_discard_sandbox(sandbox_task), "clone")
+        raise
 
     # Drain any remaining scrape progress messages
     while not scrape_progress_queue.empty():
@@ -1052,8 +1127,9 @@ async def run_clone_streaming(url: str) -> AsyncGenerator[str, None]:
         yield sse_event("step", {"step": "scraping", "message": msg})
 
     sections_raw = scrape_data.get("sections", [])
-    images_raw = scrape_data.get("assets", {}).get("images", [])
-    fonts_raw = scrape_data.get("assets", {}).get("fonts", [])
+    assets_data = scrape_data.get("assets", {})
+    images_raw = assets_data.get("images", [])
+    fonts_raw = assets_data.get("fonts", [])
     theme_data = scrape_data.get("theme", {})
     clickables_data = scrape_data.get("clickables", {})
     screenshots_data = scrape_data.get("screenshots", {})
@@ -1310,14 +1386,9 @@ async def run_clone_streaming(url: str) -> AsyncGenerator[str, None]:
 
         # 2b. Fast-path: "Module not found" → install the package directly
         #     instead of wasting an AI fix iteration on a missing npm package.
-        missing_modules = re.findall(
-            r"Module not found: Can't resolve ['\"]([^'\"]+)['\"]", logs
-        )
+        missing_modules = _MODULE_NOT_FOUND_RE.findall(logs)
         # Also check the HTTP body for the same pattern
-        missing_modules += re.findall(
-            r"Module not found: Can't resolve ['\"]([^'\"]+)['\"]",
-            http_result.get("body", ""),
-        )
+        missing_modules += _MODULE_NOT_FOUND_RE.findall(http_result.get("body", ""))
         # Dedupe
         missing_modules = list(dict.fromkeys(missing_modules))
 
@@ -1377,9 +1448,19 @@ async def run_clone_streaming(url: str) -> AsyncGenerator[str, None]:
                 continue
 
         if diag.get("status") == "errors_found" and diag.get("fixed_files"):
-            fixed = diag["fixed_files"]
             diagnosis = diag.get("diagnosis", "")
             _log(f"AI diagnosis: {diagnosis[:150]}")
+
+            # The AI often echoes files back untouched — only re-upload,
+            # touch and re-emit the ones whose content actually changed.
+            current = state["files"]
+            fixed = {
+                fp: content for fp, content in diag["fixed_files"].items()
+                if current.get(fp) != content
+            }
+            if not fixed:
+                _log("AI returned only unchanged files — retrying diagnosis")
+                continue
             _log(f"AI fixed {len(fixed)} files: {list(fixed.keys())}")
 
             fix_iterations += 1
@@ -1449,7 +1530,6 @@ async def run_clone_streaming(url: str) -> AsyncGenerator[str, None]:
 
     # Update DB
     try:
-        from app.database import update_clone
         if state.get("clone_id"):
             await update_clone(state["clone_id"], {
                 "status": final_status,
@@ -1601,7 +1681,6 @@ async def hot_fix_file(clone_id: str, filepath: str, content: str) -> dict:
 
     if not sandbox_id:
         try:
-            from app.database import get_clone
             clone = await get_clone(clone_id)
             if clone:
                 sandbox_id = clone.get("sandbox_id")
@@ -1634,7 +1713,6 @@ async def hot_fix_file(clone_id: str, filepath: str, content: str) -> dict:
     # Sync latest files to Supabase so rebuilds use the latest version
     if session and session.get("files"):
         try:
-            from app.database import sync_files_to_supabase
             await sync_files_to_supabase(clone_id, session["files"])
         except Exception as e:
             print(f"  [hot_fix_file] Supabase sync failed: {e}")
@@ -1732,7 +1810,6 @@ async def run_chat_followup(
     if not session:
         # Try to restore session from Supabase
         try:
-            from app.database import get_clone
             clone = await get_clone(clone_id)
             if clone and clone.get("sandbox_id"):
                 metadata = clone.get("metadata") or {}
@@ -1768,11 +1845,18 @@ async def run_chat_followup(
 
     client = _get_client()
 
-    file_listing = "\n".join(
-        f"--- {fp} ---\n{content[:3000]}"
-        for fp, content in files.items()
-        if fp.endswith((".jsx", ".tsx", ".css", ".js"))
-    )
+    # The prompt takes the first 20000 chars; count as we go rather than
+    # joining every file and throwing most of it away
+    parts = []
+    listed = 0
+    for fp, content in files.items():
+        if fp.endswith((".jsx", ".tsx", ".css", ".js")):
+            part = f"--- {fp} ---\n{content[:3000]}"
+            parts.append(part)
+            listed += len(part) + 1
+            if listed >= 20000:
+                break
+    file_listing = "\n".join(parts)
 
     messages = [
         {
@@ -1832,12 +1916,15 @@ async def run_chat_followup(
 
             result = await _handle_chat_tool(tool_name, tool_input, project_root)
 
-            try:
-                parsed_result = json.loads(result)
-                if "preview_url" in parsed_result:
-                    yield sse_event("deployed", {"preview_url": parsed_result["preview_url"]})
-            except Exception:
-                pass
+            # Only re-parse the tool result when it can carry a preview URL —
+            # the update/log results never do.
+            if '"preview_url"' in result:
+                try:
+                    parsed_result = json.loads(result)
+                    if "preview_url" in parsed_result:
+                        yield sse_event("deployed", {"preview_url": parsed_result["preview_url"]})
+                except Exception:
+                    pass
 
             tool_results.append({
                 "type": "tool_result",
@@ -1856,7 +1943,6 @@ async def run_chat_followup(
 
     # Sync latest files to Supabase so rebuilds use the latest version
     try:
-        from app.database import sync_files_to_supabase
         await sync_files_to_supabase(clone_id, files)
     except Exception as e:
         print(f"  [chat_followup] Supabase sync failed: {e}")
@@ -1867,8 +1953,14 @@ async def run_chat_followup(
 # ---------------------------------------------------------------
 
 async def run_clone_agent(url: str, output_format: str = "react") -> dict:
-    """Synchronous-style wrapper for the streaming pipeline."""
+    """
+    Synchronous-style wrapper for the streaming pipeline.
+    If the caller cancels (e.g. the /clone timeout), the sandbox created for
+    this run is deleted before the cancellation propagates — otherwise it
+    would keep running (and billing) until Daytona's auto-stop.
+    """
     result = {
+        "clone_id": None,
         "preview_url": None,
         "sandbox_id": None,
         "files": {},
@@ -1876,27 +1968,36 @@ async def run_clone_agent(url: str, output_format: str = "react") -> dict:
         "status": "processing",
     }
 
-    async for event_str in run_clone_streaming(url):
-        try:
-            if event_str.startswith("data: "):
-                data = json.loads(event_str[6:].strip())
-                event_type = data.get("type")
-
-                if event_type == "deployed":
-                    result["preview_url"] = data.get("preview_url")
-                    result["sandbox_id"] = data.get("sandbox_id")
-                elif event_type == "done":
-                    result["preview_url"] = data.get("preview_url")
-                    result["sandbox_id"] = data.get("sandbox_id")
-                    result["status"] = "success" if data.get("preview_url") else "failed"
-                elif event_type == "file":
-                    result["files"][data.get("path", "")] = data.get("content", "")
-                elif event_type == "file_updated":
-                    result["files"][data.get("path", "")] = data.get("content", "")
-                elif event_type == "error":
-                    result["status"] = "failed"
-        except Exception:
-            pass
+    stream = run_clone_streaming(url)
+    try:
+        async for event_str in stream:
+            try:
+                if event_str.startswith("data: "):
+                    data = json.loads(event_str[6:].strip())
+                    event_type = data.get("type")
+
+                    if event_type == "clone_created":
+                        result["clone_id"] = data.get("clone_id")
+                    elif event_type == "deployed":
+                        result["preview_url"] = data.get("preview_url")
+                        result["sandbox_id"] = data.get("sandbox_id")
+                    elif event_type == "done":
+                        result["preview_url"] = data.get("preview_url")
+                        result["sandbox_id"] = data.get("sandbox_id")
+                        result["status"] = "success" if data.get("preview_url") else "failed"
+                    elif event_type == "file":
+                        result["files"][data.get("path", "")] = data.get("content", "")
+                    elif event_type == "file_updated":
+                        result["files"][data.get("path", "")] = data.get("content", "")
+                    elif event_type == "error":
+                        result["status"] = "failed"
+            except Exception:
+                pass
+    except asyncio.CancelledError:
+        await stream.aclose()
+        if result["status"] == "processing":
+            await asyncio.shield(_cleanup_cancelled_clone(result["clone_id"], result["sandbox_id"]))
+        raise
 
     if not result["preview_url"]:
         result["status"] = "failed"
@@ -1904,6 +2005,34 @@ async def run_clone_agent(url: str, output_format: str = "react") -> dict:
     return result
 
 
+async def _discard_sandbox(sandbox_task: asyncio.Task):
+    """Delete the sandbox an abandoned provisioning task creates (or already created)."""
+    try:
+        sandbox_info = await sandbox_task
+    except (Exception, asyncio.CancelledError):
+        return
+    try:
+        await stop_sandbox(sandbox_info["sandbox_id"], delete=True)
+        print(f"[clone] Aborted — deleted unannounced sandbox {sandbox_info['sandbox_id'][:12]}")
+    except Exception as e:
+        print(f"[clone] Aborted — sandbox delete failed: {e}")
+
+
+async def _cleanup_cancelled_clone(clone_id: str | None, sandbox_id: str | None):
+    """Delete the sandbox of a cancelled run and mark its clone failed."""
+    if sandbox_id:
+        try:
+            await stop_sandbox(sandbox_id, delete=True)
+            print(f"[clone] Cancelled — deleted sandbox {sandbox_id[:12]}")
+        except Exception as e:
+            print(f"[clone] Cancelled — sandbox delete failed: {e}")
+    if clone_id:
+        try:
+            await update_clone(clone_id, {"status": "failed", "is_active": False, "sandbox_id": None})
+        except Exception as e:
+            print(f"[clone] Cancelled — DB update failed: {e}")
+
+
 async def run_clone_agent_streaming(
     url: str, output_format: str = "react"
 ) -> AsyncGenerator[str, None]:
@@ -0,0 +1,36 @@
+"""
+Fire-and-forget tasks shared by the API handlers and the clone pipeline.
+
+One registry for the whole process, so the app's shutdown can wait for
+every in-flight write-back / sandbox delete no matter which module
+spawned it.
+"""
+
+import asyncio
+
+
+# Held so tasks aren't garbage collected mid-flight; drained on shutdown
+_background_tasks: set[asyncio.Task] = set()
+
+
+def spawn_background(coro, label: str) -> asyncio.Task:
+    """
+    Run work nothing waits on (DB writes, sandbox deletes) as a tracked
+    task. Failures are logged instead of silently dropped.
+    """
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+
+    def _done(t: asyncio.Task):
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception():
+            print(f"[{label}] Background task failed: {t.exception()}")
+
+    task.add_done_callback(_done)
+    return task
+
+
+async def drain_background():
+    """Wait for every tracked task, including ones spawned while draining."""
+    while _background_tasks:
+        await asyncio.gather(*list(_background_tasks), return_exceptions=True)
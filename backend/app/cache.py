@@ -0,0 +1,95 @@
+"""
+In-process caches shared across requests.
+"""
+
+import copy
+
+from cachetools import TTLCache
+
+
+# Clone rows keyed by id. The short TTL bounds staleness for writes that
+# go straight to the clones table (bulk updates keyed by sandbox_id).
+_clone_cache: TTLCache = TTLCache(maxsize=1000, ttl=30)
+
+# Invalidation counters: per id, plus one for full clears. A fetch reads
+# clone_cache_token() before hitting the DB and passes it to cache_clone(),
+# which refuses the row if an invalidation happened in between — otherwise
+# a read racing an update could cache the pre-update row. Counters only
+# need to outlive an in-flight fetch, so they are bounded by a long TTL.
+_clone_generations: TTLCache = TTLCache(maxsize=10000, ttl=600)
+_clear_generation = 0
+
+
+def get_cached_clone(clone_id: str) -> dict | None:
+    """Return a copy of a cached clone row, or None on a miss."""
+    row = _clone_cache.get(clone_id)
+    return copy.deepcopy(row) if row is not None else None
+
+
+def clone_cache_token(clone_id: str) -> tuple[int, int]:
+    """Snapshot of the invalidation state for `clone_id`, taken before a fetch."""
+    return _clone_generations.get(clone_id, 0), _clear_generation
+
+
+def cache_clone(clone_id: str, row: dict, token: tuple[int, int] | None = None):
+    """
+    Store a clone row. Callers get copies, so later mutation is safe.
+    With a `token` from clone_cache_token(), the row is dropped if the clone
+    was invalidated since the token was taken (the row may predate a write).
+    """
+    if not row:
+        return
+    if token is not None and token != clone_cache_token(clone_id):
+        return
+    _clone_cache[clone_id] = copy.deepcopy(row)
+
+
+def invalidate_clone(clone_id: str | None = None):
+    """Drop one cached clone, or every cached clone when no id is given."""
+    global _clear_generation
+    if clone_id is None:
+        _clear_generation += 1
+        _clone_cache.clear()
+    else:
+        _clone_generations[clone_id] = _clone_generations.get(clone_id, 0) + 1
+        _clone_cache.pop(clone_id, None)
+
+
+class SessionCache(TTLCache):
+    """
+    TTLCache that hands entries dropped for age or size to `on_evict`.
+    pop()/del and clear() are deliberate removals and skip the callback.
+    Reads refresh the TTL, so a session expires after `ttl` without use
+    rather than `ttl` after it was first stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, on_evict):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._on_evict = on_evict
+
+    def __getitem__(self, key):
+        # get() goes through here too. Sessions are mutated in place, so
+        # re-setting on read is the only point that sees every use.
+        value = super().__getitem__(key)
+        super().__setitem__(key, value)
+        return value
+
+    def expire(self, time=None):
+        # TTLCache.expire() returns the expired (key, value) pairs only since
+        # cachetools 5.3 — hence the pin in requirements.txt
+        expired = super().expire(time)
+        for key, value in expired or ():
+            self._on_evict(key, value)
+        return expired
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._on_evict(key, value)
+        return key, value
+
+    def clear(self):
+        on_evict, self._on_evict = self._on_evict, lambda key, value: None
+        try:
+            super().clear()
+        finally:
+            self._on_evict = on_evict
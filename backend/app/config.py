@@ -21,6 +21,16 @@ class Settings(BaseSettings):
     # Sandbox auto-stop (minutes of inactivity before Daytona stops the sandbox)
     sandbox_auto_stop_minutes: int = 30
 
+    # Prebuilt Daytona snapshot with the Next.js project already scaffolded at
+    # PROJECT_PATH (built by create_snapshot.py). Empty = scaffold on every create.
+    sandbox_snapshot: str = ""
+
+    # Comma-separated CORS origins, e.g. "https://app.example.com,http://localhost:3000"
+    allowed_origins: str = "*"
+
+    # Log level for the API layer (DEBUG, INFO, WARNING, ...)
+    log_level: str = "INFO"
+
     class Config:
         # Look for .env in the repo root (two levels up from backend/app/)
         # On Railway/production, env vars are injected directly — .env is optional
@@ -2,11 +2,22 @@
 Supabase client for clone record CRUD.
 """
 
+import asyncio
+import copy
+import uuid
+from functools import lru_cache
+
+from app.cache import cache_clone, clone_cache_token, get_cached_clone, invalidate_clone
 from app.config import get_settings
 
 
+@lru_cache()
 def _get_client():
-    """Get a Supabase client. Raises if credentials are missing."""
+    """
+    Get the shared Supabase client. Raises if credentials are missing.
+    One client means one pooled HTTP session instead of a new TLS
+    handshake per query.
+    """
     settings = get_settings()
     url = settings.supabase_url
     key = settings.supabase_key
@@ -27,6 +38,7 @@ async def update_clone(clone_id: str, data: dict) -> dict:
     """Update a clone record."""
     client = _get_client()
     result = client.table("clones").update(data).eq("id", clone_id).execute()
+    invalidate_clone(clone_id)
     return result.data[0] if result.data else {}
 
 
@@ -43,23 +55,102 @@ async def get_clones(limit: int = 20) -> list:
     return result.data
 
 
-async def get_clone(clone_id: str) -> dict:
-    """Get a single clone by ID."""
+def _fetch_clones(clone_ids: list[str]) -> list[dict]:
+    """Fetch several clone rows in one PostgREST `id=in.(...)` query."""
     client = _get_client()
-    result = (
-        client.table("clones")
-        .select("*")
-        .eq("id", clone_id)
-        .single()
-        .execute()
-    )
-    return result.data
+    result = client.table("clones").select("*").in_("id", clone_ids).execute()
+    return result.data or []
+
+
+def _normalize_id(clone_id) -> str:
+    """
+    Canonical form for matching ids: Postgres echoes uuids lowercase and
+    hyphenated, whatever casing the caller sent.
+    """
+    try:
+        return str(uuid.UUID(str(clone_id)))
+    except ValueError:
+        return str(clone_id).lower()
+
+
+class _CloneBatcher:
+    """
+    DataLoader-style batcher for get_clone(): ids requested within a short
+    window are fetched with one query instead of one request each.
+    """
+
+    def __init__(self, max_batch: int = 100, wait_ms: int = 10):
+        self.max_batch = max_batch
+        self.wait_ms = wait_ms
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set = set()
+
+    def load(self, clone_id: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(clone_id, []).append(future)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.wait_ms / 1000, self._flush)
+        return future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: dict[str, list[asyncio.Future]]):
+        try:
+            rows = await asyncio.to_thread(_fetch_clones, list(batch))
+        except Exception as e:
+            if len(batch) == 1:
+                for future in next(iter(batch.values())):
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            # One malformed id fails the whole in.(...) query — retry singly
+            # so a bad request can't poison its neighbours.
+            for clone_id, futures in batch.items():
+                await self._dispatch({clone_id: futures})
+            return
+
+        by_id = {_normalize_id(row.get("id")): row for row in rows}
+        for clone_id, futures in batch.items():
+            row = by_id.get(_normalize_id(clone_id))
+            for i, future in enumerate(futures):
+                if not future.done():
+                    future.set_result(row if i == 0 else copy.deepcopy(row))
+
+
+_clone_batcher = _CloneBatcher()
+
+
+async def get_clone(clone_id: str) -> dict | None:
+    """
+    Get a single clone by ID (served from a short-lived cache when warm).
+    Returns None if the clone doesn't exist.
+    """
+    cached = get_cached_clone(clone_id)
+    if cached is not None:
+        return cached
+    token = clone_cache_token(clone_id)
+    row = await _clone_batcher.load(clone_id)
+    cache_clone(clone_id, row, token)
+    return row
 
 
 async def delete_clone(clone_id: str) -> bool:
     """Delete a clone record."""
     client = _get_client()
     client.table("clones").delete().eq("id", clone_id).execute()
+    invalidate_clone(clone_id)
     return True
 
 
@@ -70,6 +161,7 @@ async def sync_files_to_supabase(clone_id: str, files: dict):
     current_metadata = (result.data or {}).get("metadata") or {}
     current_metadata["files"] = files
     client.table("clones").update({"metadata": current_metadata}).eq("id", clone_id).execute()
+    invalidate_clone(clone_id)
 
 
 async def toggle_clone_active(clone_id: str, is_active: bool) -> dict:
@@ -81,4 +173,5 @@ async def toggle_clone_active(clone_id: str, is_active: bool) -> dict:
         .eq("id", clone_id)
         .execute()
     )
+    invalidate_clone(clone_id)
     return result.data[0] if result.data else {}
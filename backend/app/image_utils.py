@@ -43,3 +43,26 @@ def screenshot_to_b64(screenshot_bytes: bytes, compress: bool = True,
         return base64.b64encode(optimized).decode(), "image/jpeg"
     else:
         return base64.b64encode(screenshot_bytes).decode(), "image/png"
+
+
+def perceptual_hash(screenshot_bytes: bytes, hash_size: int = 8) -> int:
+    """
+    Difference hash of a screenshot as a 64-bit int (for hash_size=8).
+    Near-identical images differ in only a few bits, so two captures of
+    the same viewport can be detected without sending both to Claude.
+    """
+    img = Image.open(io.BytesIO(screenshot_bytes)).convert('L')
+    img = img.resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = list(img.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hash_distance(a: int, b: int) -> int:
+    """Number of differing bits between two perceptual hashes."""
+    return (a ^ b).bit_count()
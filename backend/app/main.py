@@ -1,29 +1,94 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 import asyncio
+import hashlib
+import io
+import logging
+import logging.handlers
+import queue
+import time
+import zipfile
+
+import orjson
+
+from app.agent import (
+    _chat_sessions,
+    _restart_dev_server,
+    active_sandboxes,
+    hot_fix_file,
+    run_chat_followup,
+    run_clone_agent,
+    run_clone_agent_streaming,
+)
+from app.background import drain_background, spawn_background
+from app.cache import invalidate_clone
+from app.config import get_settings
+from app.database import (
+    _get_client as get_db,
+    delete_clone,
+    get_clone,
+    get_clones,
+    sync_files_to_supabase,
+    toggle_clone_active,
+    update_clone,
+)
+from app.sandbox import (
+    create_react_boilerplate_sandbox,
+    get_daytona_client,
+    start_sandbox_monitor,
+    stop_sandbox,
+    PROJECT_PATH,
+)
+from app.sandbox_template import get_sandbox_logs, upload_files_to_sandbox
+from app.scraper import close_browser
+from app.sse_utils import coalesce_sse, sse_event
+
+
+# Log records are handed to a queue and written by a listener thread, so
+# request handlers never block on stderr. Level comes from LOG_LEVEL.
+logger = logging.getLogger(__name__)
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.setLevel(get_settings().log_level.upper())
+logger.propagate = False
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    _log_listener.start()
     # Startup: sandbox status checker
     try:
-        from app.sandbox import start_sandbox_monitor
         start_sandbox_monitor()
     except Exception as e:
-        print(f"[sandbox-monitor] Failed to start: {e}")
+        logger.error("[sandbox-monitor] Failed to start: %s", e)
     yield
+    # Shutdown: let in-flight background writes/deletes finish
+    await drain_background()
+    try:
+        await close_browser()
+    except Exception as e:
+        logger.error("[scrape] Failed to close shared browser: %s", e)
+    _log_listener.stop()
 
 
-app = FastAPI(title="Backend API", lifespan=lifespan)
+app = FastAPI(title="Backend API", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# A wildcard with credentials makes Starlette echo each request's Origin;
+# the frontend sends no cookies, so credentials are only enabled for an
+# explicit origin list (ALLOWED_ORIGINS).
+_allowed_origins = [o.strip() for o in get_settings().allowed_origins.split(",") if o.strip()] or ["*"]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=_allowed_origins,
+    allow_credentials="*" not in _allowed_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -34,16 +99,36 @@ app.add_middleware(
 # ---------------------------------------------------------------------------
 
 class CloneRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     url: str
 
 
 class CloneResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     clone_id: str
     preview_url: str | None = None
     status: str
     iterations: int | None = None
 
 
+def _etag_response(request: Request, payload) -> Response:
+    """
+    JSON response with a content ETag. A matching If-None-Match gets a bodyless
+    304. `no-cache` makes clients revalidate every time — the frontend
+    refetches /clones right after mutations, so a max-age would show stale
+    history.
+    """
+    body = orjson.dumps(payload)
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
@@ -66,18 +151,17 @@ async def clone_website_endpoint(request: CloneRequest):
         url = "https://" + url
 
     try:
-        from app.agent import run_clone_agent
-        agent_result = await asyncio.wait_for(
-            run_clone_agent(url),
-            timeout=600,
-        )
-
-        return CloneResponse(
-            clone_id=agent_result.get("clone_id", "no-db"),
-            preview_url=agent_result.get("preview_url"),
-            status=agent_result["status"],
-            iterations=agent_result.get("iterations"),
-        )
+        async with asyncio.timeout(600):
+            agent_result = await run_clone_agent(url)
+
+        # Shape matches CloneResponse (kept as response_model for the schema);
+        # returning the response directly skips re-validating it.
+        return ORJSONResponse({
+            "clone_id": agent_result.get("clone_id") or "no-db",
+            "preview_url": agent_result.get("preview_url"),
+            "status": agent_result["status"],
+            "iterations": agent_result.get("iterations"),
+        })
 
     except asyncio.TimeoutError:
         raise HTTPException(status_code=504, detail="Clone timed out. Try a simpler page.")
@@ -86,25 +170,24 @@ async def clone_website_endpoint(request: CloneRequest):
 
 
 @app.get("/clones")
-async def list_clones(limit: int = 20):
+async def list_clones(request: Request, limit: int = 20):
     """List recent clones from Supabase."""
     try:
-        from app.database import get_clones
         clones = await get_clones(limit=min(limit, 50))
-        return {"clones": clones}
+        return _etag_response(request, {"clones": clones})
     except Exception as e:
         return {"clones": [], "error": str(e)}
 
 
 @app.get("/clone/{clone_id}")
-async def get_clone_detail(clone_id: str):
+async def get_clone_detail(request: Request, clone_id: str):
     """Get full details of a clone from Supabase."""
     try:
-        from app.database import get_clone
         clone = await get_clone(clone_id)
         if not clone:
             raise HTTPException(status_code=404, detail="Clone not found")
-        return clone
+        # Raw Supabase row — skip jsonable_encoder and serialize directly
+        return _etag_response(request, clone)
     except HTTPException:
         raise
     except Exception as e:
@@ -115,10 +198,8 @@ async def get_clone_detail(clone_id: str):
 async def delete_clone_endpoint(clone_id: str):
     """Delete a clone and its sandbox permanently."""
     try:
-        from app.database import get_clone, delete_clone
         clone = await get_clone(clone_id)
         if clone and clone.get("sandbox_id"):
-            from app.sandbox import stop_sandbox
             await stop_sandbox(clone["sandbox_id"], delete=True)
         await delete_clone(clone_id)
         return {"status": "deleted"}
@@ -127,15 +208,40 @@ async def delete_clone_endpoint(clone_id: str):
 
 
 class ToggleActiveRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     is_active: bool
 
 
+async def _sync_and_delete_sandbox(clone_id: str, sandbox_id: str | None, tag: str):
+    """
+    Persist the session's in-memory files and delete the sandbox concurrently.
+    The sync reads the session, not the sandbox, so neither step waits on the
+    other. Failures are logged and swallowed, as each step is best-effort.
+    """
+    async def _sync():
+        session = _chat_sessions.get(clone_id)
+        if session and session.get("files"):
+            try:
+                await sync_files_to_supabase(clone_id, session["files"])
+            except Exception as e:
+                logger.warning("[%s] File sync failed: %s", tag, e)
+
+    async def _delete():
+        if not sandbox_id:
+            return
+        try:
+            await stop_sandbox(sandbox_id, delete=True)
+        except Exception as e:
+            logger.warning("[%s] Sandbox delete failed: %s", tag, e)
+
+    await asyncio.gather(_sync(), _delete())
+
+
 @app.patch("/clone/{clone_id}/active")
 async def toggle_clone_active_endpoint(clone_id: str, request: ToggleActiveRequest):
     """Toggle a clone's active status. Deletes the sandbox if deactivating."""
     try:
-        from app.database import get_clone, toggle_clone_active, update_clone, sync_files_to_supabase
-        from app.agent import _chat_sessions
         clone = await get_clone(clone_id)
         if not clone:
             raise HTTPException(status_code=404, detail="Clone not found")
@@ -145,20 +251,8 @@ async def toggle_clone_active_endpoint(clone_id: str, request: ToggleActiveReque
             if clone.get("status") == "processing":
                 raise HTTPException(status_code=409, detail="Clone is still processing — cannot deactivate")
 
-            # Sync latest files to Supabase before destroying
-            session = _chat_sessions.get(clone_id)
-            if session and session.get("files"):
-                try:
-                    await sync_files_to_supabase(clone_id, session["files"])
-                except Exception as e:
-                    print(f"[toggle_active] File sync failed: {e}")
-
-            # DELETE the sandbox (not just stop) to free resources
-            try:
-                from app.sandbox import stop_sandbox
-                await stop_sandbox(clone["sandbox_id"], delete=True)
-            except Exception as e:
-                print(f"Failed to delete sandbox: {e}")
+            # Sync latest files to Supabase and DELETE the sandbox (not just stop)
+            await _sync_and_delete_sandbox(clone_id, clone["sandbox_id"], "toggle_active")
 
             # Clear sandbox_id since it no longer exists
             await update_clone(clone_id, {"sandbox_id": None})
@@ -184,8 +278,6 @@ async def deactivate_clone_endpoint(clone_id: str):
     to prevent destroying sandboxes mid-clone.
     """
     try:
-        from app.database import get_clone, update_clone, sync_files_to_supabase
-        from app.agent import _chat_sessions
 
         clone = await get_clone(clone_id)
         if not clone:
@@ -193,25 +285,11 @@ async def deactivate_clone_endpoint(clone_id: str):
 
         # GUARD: never destroy a sandbox for a clone that's still processing
         if clone.get("status") == "processing":
-            print(f"[deactivate] BLOCKED — clone {clone_id[:12]} is still processing, refusing to delete sandbox")
+            logger.info("[deactivate] BLOCKED — clone %s is still processing, refusing to delete sandbox", clone_id[:12])
             return {"status": "blocked", "reason": "clone is still processing"}
 
-        # Sync latest in-memory files before destroying
-        session = _chat_sessions.get(clone_id)
-        if session and session.get("files"):
-            try:
-                await sync_files_to_supabase(clone_id, session["files"])
-            except Exception as e:
-                print(f"[deactivate] File sync failed: {e}")
-
-        # Delete the Daytona sandbox
-        sandbox_id = clone.get("sandbox_id")
-        if sandbox_id:
-            try:
-                from app.sandbox import stop_sandbox
-                await stop_sandbox(sandbox_id, delete=True)
-            except Exception as e:
-                print(f"[deactivate] Sandbox delete failed: {e}")
+        # Sync latest in-memory files and delete the Daytona sandbox
+        await _sync_and_delete_sandbox(clone_id, clone.get("sandbox_id"), "deactivate")
 
         # Update DB: mark inactive, clear sandbox_id
         await update_clone(clone_id, {
@@ -224,7 +302,7 @@ async def deactivate_clone_endpoint(clone_id: str):
 
         return {"status": "deactivated"}
     except Exception as e:
-        print(f"[deactivate] Error: {e}")
+        logger.error("[deactivate] Error: %s", e)
         return {"status": "error", "message": str(e)}
 
 
@@ -235,7 +313,6 @@ async def rebuild_clone_endpoint(clone_id: str):
     Old sandbox is always deleted on navigate-away, so we always create fresh.
     """
     try:
-        from app.database import get_clone, update_clone
         clone = await get_clone(clone_id)
         if not clone:
             raise HTTPException(status_code=404, detail="Clone not found")
@@ -246,14 +323,9 @@ async def rebuild_clone_endpoint(clone_id: str):
             raise HTTPException(status_code=400, detail="No saved files to rebuild from")
 
         # Always create a fresh sandbox
-        from app.sandbox import create_react_boilerplate_sandbox
         sandbox_result = await create_react_boilerplate_sandbox()
         project_root = sandbox_result.get("project_root", "/home/daytona/my-app")
 
-        from app.sandbox_template import upload_files_to_sandbox
-        from app.sandbox import get_daytona_client, BUN_BIN
-        from app.agent import _restart_dev_server, active_sandboxes, _chat_sessions
-        import time
 
         # Remove conflicting .tsx files (scaffolded defaults) if we have .jsx versions
         tsx_to_remove = [fp.replace(".jsx", ".tsx") for fp in saved_files if fp.endswith(".jsx")]
@@ -323,8 +395,6 @@ async def rebuild_clone_endpoint(clone_id: str):
 @app.post("/clone/stream")
 async def clone_stream(request: CloneRequest):
     """Clone a website with real-time streaming progress via SSE."""
-    from app.agent import run_clone_agent_streaming
-    from app.sse_utils import sse_event
 
     url = request.url.strip()
     if not url.startswith(("http://", "https://")):
@@ -338,33 +408,32 @@ async def clone_stream(request: CloneRequest):
                     got_done = True
                 yield event
         except Exception as e:
-            print(f"[clone/stream] Generator crashed: {e}")
+            logger.exception("[clone/stream] Generator crashed: %s", e)
             yield sse_event("error", {"message": f"Server error: {e}"})
         finally:
             if not got_done:
                 yield sse_event("done", {"preview_url": None, "error": "Stream ended unexpectedly"})
 
     return StreamingResponse(
-        event_stream(),
+        coalesce_sse(event_stream()),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",
-            "Access-Control-Allow-Origin": "*",
         },
     )
 
 
 class ChatRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     message: str
 
 
 @app.post("/clone/{clone_id}/chat")
 async def clone_chat(clone_id: str, request: ChatRequest):
     """Send a follow-up message to the agent about an existing clone."""
-    from app.agent import run_chat_followup
-    from app.sse_utils import sse_event
 
     if not request.message.strip():
         raise HTTPException(status_code=400, detail="message is required")
@@ -377,20 +446,19 @@ async def clone_chat(clone_id: str, request: ChatRequest):
                     got_done = True
                 yield event
         except Exception as e:
-            print(f"[clone/{clone_id}/chat] Generator crashed: {e}")
+            logger.exception("[clone/%s/chat] Generator crashed: %s", clone_id, e)
             yield sse_event("error", {"message": f"Server error: {e}"})
         finally:
             if not got_done:
                 yield sse_event("done", {"preview_url": None, "error": "Chat stream ended unexpectedly"})
 
     return StreamingResponse(
-        event_stream(),
+        coalesce_sse(event_stream()),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",
-            "Access-Control-Allow-Origin": "*",
         },
     )
 
@@ -398,13 +466,11 @@ async def clone_chat(clone_id: str, request: ChatRequest):
 @app.get("/clone/{clone_id}/files")
 async def get_clone_files(clone_id: str):
     """Get all generated files for a clone (session first, then Supabase fallback)."""
-    from app.agent import _chat_sessions
     session = _chat_sessions.get(clone_id)
     if session:
         return {"files": session["state"].get("files", {})}
 
     try:
-        from app.database import get_clone
         clone = await get_clone(clone_id)
         if not clone:
             raise HTTPException(status_code=404, detail="Clone not found")
@@ -432,7 +498,6 @@ async def get_clone_logs(
 
     project_root = None
     if clone_id:
-        from app.agent import _chat_sessions
         session = _chat_sessions.get(clone_id)
         if session:
             sandbox_id = sandbox_id or session["state"].get("sandbox_id")
@@ -440,7 +505,6 @@ async def get_clone_logs(
 
     if not sandbox_id and clone_id:
         try:
-            from app.database import get_clone
             clone = await get_clone(clone_id)
             if clone:
                 sandbox_id = clone.get("sandbox_id")
@@ -450,22 +514,23 @@ async def get_clone_logs(
     if not sandbox_id:
         raise HTTPException(status_code=404, detail="Sandbox not found for clone_id")
 
-    from app.sandbox_template import get_sandbox_logs
-    from app.sandbox import PROJECT_PATH
     logs = await get_sandbox_logs(sandbox_id, project_root or PROJECT_PATH, lines=lines)
     return {"sandbox_id": sandbox_id, "logs": logs}
 
 
+class FileUpdateRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    content: str = ""
+
+
 @app.put("/clone/{clone_id}/files/{filepath:path}")
-async def update_clone_file(clone_id: str, filepath: str, request: dict):
+async def update_clone_file(clone_id: str, filepath: str, request: FileUpdateRequest):
     """
     User manually edits a file via the frontend editor.
     Uploads to sandbox and triggers Next.js hot-reload.
     """
-    content = request.get("content", "")
-
-    from app.agent import hot_fix_file
-    result = await hot_fix_file(clone_id, filepath, content)
+    result = await hot_fix_file(clone_id, filepath, request.content)
 
     if result.get("status") == "error":
         raise HTTPException(status_code=400, detail=result.get("message", "Update failed"))
@@ -478,6 +543,8 @@ async def update_clone_file(clone_id: str, filepath: str, request: dict):
 # ---------------------------------------------------------------------------
 
 class StopCloneRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     sandbox_id: str | None = None
     clone_id: str | None = None
 
@@ -488,13 +555,11 @@ async def stop_clone_endpoint(request: StopCloneRequest):
     sandbox_id = request.sandbox_id
 
     if not sandbox_id and request.clone_id:
-        from app.agent import _chat_sessions
         session = _chat_sessions.get(request.clone_id)
         if session:
             sandbox_id = session["state"].get("sandbox_id")
         if not sandbox_id:
             try:
-                from app.database import get_clone
                 clone = await get_clone(request.clone_id)
                 if clone:
                     sandbox_id = clone.get("sandbox_id")
@@ -503,17 +568,15 @@ async def stop_clone_endpoint(request: StopCloneRequest):
 
     if sandbox_id:
         try:
-            from app.sandbox import stop_sandbox
             await stop_sandbox(sandbox_id, delete=True)
         except Exception as e:
-            print(f"Failed to delete sandbox {sandbox_id}: {e}")
+            logger.warning("[clone/stop] Failed to delete sandbox %s: %s", sandbox_id, e)
 
     if request.clone_id:
-        try:
-            from app.database import update_clone
-            await update_clone(request.clone_id, {"status": "stopped", "is_active": False})
-        except Exception:
-            pass
+        spawn_background(
+            update_clone(request.clone_id, {"status": "stopped", "is_active": False}),
+            "clone/stop",
+        )
 
     return {"status": "stopped", "sandbox_id": sandbox_id}
 
@@ -529,8 +592,6 @@ async def cleanup_all_sandboxes():
     returns immediately and does NOT hold _daytona_lock while the user
     starts a new clone.
     """
-    from app.agent import active_sandboxes, _chat_sessions
-    from app.database import _get_client as get_db
 
     # Collect sandbox IDs to delete BEFORE clearing in-memory state
     sandbox_ids_to_delete: set[str] = set(active_sandboxes.keys())
@@ -558,8 +619,9 @@ async def cleanup_all_sandboxes():
             "is_active": False,
             "sandbox_id": None,
         }).not_.is_("sandbox_id", "null").execute()
+        invalidate_clone()
     except Exception as e:
-        print(f"[cleanup] DB error: {e}")
+        logger.error("[cleanup] DB error: %s", e)
 
     # Fire-and-forget: delete Daytona sandboxes in background so we don't
     # hold _daytona_lock and block new sandbox creation.
@@ -567,16 +629,15 @@ async def cleanup_all_sandboxes():
         deleted = 0
         for sid in sandbox_ids_to_delete:
             try:
-                from app.sandbox import stop_sandbox
                 await stop_sandbox(sid, delete=True)
                 deleted += 1
             except Exception as e:
-                print(f"[cleanup-bg] Failed to delete {sid[:12]}: {e}")
-        print(f"[cleanup-bg] Deleted {deleted}/{len(sandbox_ids_to_delete)} sandbox(es)")
+                logger.warning("[cleanup-bg] Failed to delete %s: %s", sid[:12], e)
+        logger.info("[cleanup-bg] Deleted %d/%d sandbox(es)", deleted, len(sandbox_ids_to_delete))
 
-    asyncio.create_task(_bg_delete())
+    spawn_background(_bg_delete(), "cleanup-bg")
 
-    print(f"[cleanup] Queued {len(sandbox_ids_to_delete)} sandbox(es) for background deletion")
+    logger.info("[cleanup] Queued %d sandbox(es) for background deletion", len(sandbox_ids_to_delete))
     return {"status": "cleaned", "queued": len(sandbox_ids_to_delete)}
 
 
@@ -586,10 +647,6 @@ async def export_clone_files(clone_id: str):
     Export all files for a clone as a downloadable .zip.
     Pulls from in-memory session first, falls back to Supabase metadata.
     """
-    import io
-    import zipfile
-    from fastapi.responses import Response
-    from app.agent import _chat_sessions
 
     # Get files from session or DB
     files = {}
@@ -599,7 +656,6 @@ async def export_clone_files(clone_id: str):
 
     if not files:
         try:
-            from app.database import get_clone
             clone = await get_clone(clone_id)
             if not clone:
                 raise HTTPException(status_code=404, detail="Clone not found")
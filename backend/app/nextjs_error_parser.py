@@ -5,6 +5,62 @@ Pure Python, no AI — regex-based extraction.
 
 import re
 
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+
+def _compile(pattern: str):
+    """
+    Compile with RE2 (linear-time, no catastrophic backtracking on huge
+    logs) when google-re2 is installed, else — or if RE2 rejects the
+    pattern — with the stdlib engine. Flags are written inline so the
+    pattern is valid for both.
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except Exception:
+            pass
+    return re.compile(pattern)
+
+
+# Compiled once at import — these run on every log poll during the fix loop.
+_LOG_MARKER_RE = _compile(r"=== LOG_MARKER_\d+ ===")
+_LOG_MARKER_PREFIX = "=== LOG_MARKER_"
+_COMPILE_SENTINELS = ("Compiling", "▲ Next.js")
+# Substrings at least one of which must be present for parse_nextjs_errors
+# to report anything ("Error:" covers SyntaxError/TypeError/generic,
+# "./" covers build errors; hydration is checked case-insensitively).
+_ERROR_SENTINELS = (
+    "Error:",
+    "./",
+    "Module not found:",
+    "Parsing ecmascript source code failed",
+    "default export",
+    "Failed to compile",
+)
+_COMPILED_OK_RE = _compile(r"(?i)Compiled\s+(successfully|in\s+\d)")
+_MODULE_NOT_FOUND_RE = _compile(
+    r"Module not found:\s*(?:Can't resolve|Error:\s*Can't resolve)\s*['\"]([^'\"]+)['\"]\s*(?:in\s*['\"]([^'\"]+)['\"])?"
+)
+_BUILD_ERR_RE = _compile(r"(\./[\w/.-]+\.(?:tsx?|jsx?|css))(?::(\d+)(?::(\d+))?)?[^\n]*\n([^\n]+)")
+_PARSING_FAILED_RE = _compile(r"Parsing ecmascript source code failed")
+_PARSING_FILE_RE = _compile(r"[⨯×]\s*(\./[\w/.-]+\.(?:tsx?|jsx?|css))")
+_PARSING_BRACKET_RE = _compile(r"[╭├]─\[([^\]:]+):(\d+):\d+\]")
+_PARSING_HINT_RE = _compile(r"(Expected\s+[^\n]+)")
+_SYNTAX_RE = _compile(r"SyntaxError:\s*([^\n]+?)(?:\s*\((\d+):(\d+)\))?")
+_TYPE_RE = _compile(r"TypeError:\s*([^\n]+)")
+_HYDRATION_RE = _compile(r"(?i)(?:Hydration|hydration)\s+(?:failed|mismatch|error)[^\n]*")
+_BAD_EXPORT_RE = _compile(r"(?:The default export is not a React Component|does not have a default export)")
+_GENERIC_ERR_RE = _compile(r"(?m)^\s*Error:\s*([^\n]+)")
+_RUNTIME_BANNER_RE = _compile(r"(Unhandled Runtime Error|Runtime Error|Unhandled Error)")
+_RUNTIME_ERR_RE = _compile(r"\b(TypeError|ReferenceError|RangeError|Error):\s*([^\n]+)")
+_NEARBY_FILE_RE = _compile(r"(\./[\w/.-]+\.(?:tsx?|jsx?|css))")
+_STACK_ABS_RE = _compile(r"(/[^ )]+?\.(?:tsx?|jsx?|js|ts)):(\d+):(\d+)")
+_STACK_REL_RE = _compile(r"(\./[\w/.-]+\.(?:tsx?|jsx?|js|ts)):(\d+):(\d+)")
+
 
 def parse_nextjs_errors(log_output: str) -> dict:
     """
@@ -29,37 +85,54 @@ def parse_nextjs_errors(log_output: str) -> dict:
 
     errors = []
     compiled = False
+    # Dedup as we go: (type, file, message prefix) → first occurrence wins
+    seen = set()
+    # Every message reported so far (duplicates included), for the
+    # generic-error "already captured" check
+    captured = set()
+
+    def _add(err: dict):
+        captured.add(err["message"])
+        key = (err["type"], err.get("file"), err["message"][:100])
+        if key not in seen:
+            seen.add(key)
+            errors.append(err)
 
     # If we have a LOG_MARKER, only look at content after the LAST marker
-    marker_parts = re.split(r"=== LOG_MARKER_\d+ ===", log_output)
-    if len(marker_parts) > 1:
-        log_output = marker_parts[-1]
+    log_output = _after_last_marker(log_output)
 
     # Only look at the LAST compilation result (not old ones from scaffold)
-    # Split on "Compiling" to get the most recent compilation block
-    compile_blocks = re.split(r"(?:Compiling|▲ Next\.js)", log_output)
-    last_block = compile_blocks[-1] if compile_blocks else log_output
+    # Cut after the last "Compiling" / "▲ Next.js" to get the most recent block
+    cut = 0
+    for sentinel in _COMPILE_SENTINELS:
+        idx = log_output.rfind(sentinel)
+        if idx >= 0:
+            cut = max(cut, idx + len(sentinel))
+    last_block = log_output[cut:]
 
     # Check if the LATEST compilation succeeded
-    if re.search(r"Compiled\s+(successfully|in\s+\d)", last_block, re.IGNORECASE):
+    if _COMPILED_OK_RE.search(last_block):
         compiled = True
 
     # "Failed to compile" in latest block
     if "Failed to compile" in last_block:
         compiled = False
 
+    # Fast path: every pattern below needs one of these substrings, so a
+    # clean "Compiled successfully" block skips all the regex scans.
+    if not any(sentinel in last_block for sentinel in _ERROR_SENTINELS) \
+            and "hydration" not in last_block.lower():
+        return {"has_errors": False, "compiled": compiled, "errors": []}
+
     # Use last_block for error extraction to avoid false positives from old compiles
     log_output = last_block
 
     # --- Module not found ---
     # Pattern: Module not found: Can't resolve 'xxx' in '/path/to/file'
-    for m in re.finditer(
-        r"Module not found:\s*(?:Can't resolve|Error:\s*Can't resolve)\s*['\"]([^'\"]+)['\"]\s*(?:in\s*['\"]([^'\"]+)['\"])?",
-        log_output,
-    ):
-        module = m.group(1)
-        file = m.group(2) or None
-        errors.append({
+    for m in _MODULE_NOT_FOUND_RE.finditer(log_output):
+        module, file = m.groups()
+        file = file or None
+        _add({
             "type": "module_not_found",
             "file": _extract_project_path(file) if file else None,
             "line": None,
@@ -71,16 +144,13 @@ def parse_nextjs_errors(log_output: str) -> dict:
     # Pattern: ./components/Foo.tsx:10:5
     # or: ./app/page.tsx
     # Followed by error text
-    for m in re.finditer(
-        r"(\./[\w/.-]+\.(?:tsx?|jsx?|css))(?::(\d+)(?::(\d+))?)?[^\n]*\n([^\n]+)",
-        log_output,
-    ):
-        file = m.group(1)
-        line = int(m.group(2)) if m.group(2) else None
-        msg = m.group(4).strip()
+    for m in _BUILD_ERR_RE.finditer(log_output):
+        file, line, msg = m.group(1, 2, 4)
+        line = int(line) if line else None
+        msg = msg.strip()
         # Skip if it's just a file listing, not an error
         if msg and not msg.startswith("./") and len(msg) > 5:
-            errors.append({
+            _add({
                 "type": "build_error",
                 "file": _extract_project_path(file),
                 "line": line,
@@ -92,10 +162,7 @@ def parse_nextjs_errors(log_output: str) -> dict:
     #          Parsing ecmascript source code failed
     #          ╭─[/home/daytona/my-app/app/page.jsx:25:1]
     #          │  Expected '>' but found 'class'
-    for m in re.finditer(
-        r"Parsing ecmascript source code failed",
-        log_output,
-    ):
+    for m in _PARSING_FAILED_RE.finditer(log_output):
         # Look in a window around the match for file path + line + hint
         window = log_output[max(0, m.start() - 300):m.start() + 600]
         file = None
@@ -103,16 +170,16 @@ def parse_nextjs_errors(log_output: str) -> dict:
         hint = ""
 
         # File path from ⨯ ./path or ╭─[/abs/path:line:col]
-        file_m = re.search(r"[⨯×]\s*(\./[\w/.-]+\.(?:tsx?|jsx?|css))", window)
+        file_m = _PARSING_FILE_RE.search(window)
         if file_m:
             file = _extract_project_path(file_m.group(1))
-        bracket_m = re.search(r"[╭├]─\[([^\]:]+):(\d+):\d+\]", window)
+        bracket_m = _PARSING_BRACKET_RE.search(window)
         if bracket_m:
             file = file or _extract_project_path(bracket_m.group(1))
             line = int(bracket_m.group(2))
 
         # Hint like "Expected '>' but found 'class'"
-        hint_m = re.search(r"(Expected\s+[^\n]+)", window)
+        hint_m = _PARSING_HINT_RE.search(window)
         if hint_m:
             hint = hint_m.group(1).strip()
 
@@ -120,7 +187,7 @@ def parse_nextjs_errors(log_output: str) -> dict:
         if hint:
             msg += f": {hint}"
 
-        errors.append({
+        _add({
             "type": "syntax_error",
             "file": file,
             "line": line,
@@ -129,13 +196,11 @@ def parse_nextjs_errors(log_output: str) -> dict:
         })
 
     # --- SyntaxError ---
-    for m in re.finditer(
-        r"SyntaxError:\s*([^\n]+?)(?:\s*\((\d+):(\d+)\))?",
-        log_output,
-    ):
-        msg = m.group(1).strip()
-        line = int(m.group(2)) if m.group(2) else None
-        errors.append({
+    for m in _SYNTAX_RE.finditer(log_output):
+        msg, line = m.group(1, 2)
+        msg = msg.strip()
+        line = int(line) if line else None
+        _add({
             "type": "syntax_error",
             "file": None,
             "line": line,
@@ -143,11 +208,11 @@ def parse_nextjs_errors(log_output: str) -> dict:
         })
 
     # --- TypeError ---
-    for m in re.finditer(r"TypeError:\s*([^\n]+)", log_output):
+    for m in _TYPE_RE.finditer(log_output):
         msg = m.group(1).strip()
         # Try to find a file reference nearby
         file = _find_nearby_file(log_output, m.start())
-        errors.append({
+        _add({
             "type": "type_error",
             "file": file,
             "line": None,
@@ -155,11 +220,8 @@ def parse_nextjs_errors(log_output: str) -> dict:
         })
 
     # --- Hydration mismatch ---
-    for m in re.finditer(
-        r"(?:Hydration|hydration)\s+(?:failed|mismatch|error)[^\n]*",
-        log_output, re.IGNORECASE,
-    ):
-        errors.append({
+    for m in _HYDRATION_RE.finditer(log_output):
+        _add({
             "type": "hydration_error",
             "file": None,
             "line": None,
@@ -167,12 +229,9 @@ def parse_nextjs_errors(log_output: str) -> dict:
         })
 
     # --- Bad default export ---
-    for m in re.finditer(
-        r"(?:The default export is not a React Component|does not have a default export)",
-        log_output,
-    ):
+    for m in _BAD_EXPORT_RE.finditer(log_output):
         file = _find_nearby_file(log_output, m.start())
-        errors.append({
+        _add({
             "type": "bad_export",
             "file": file,
             "line": None,
@@ -180,33 +239,24 @@ def parse_nextjs_errors(log_output: str) -> dict:
         })
 
     # --- Generic "Error:" lines not caught above ---
-    for m in re.finditer(r"^\s*Error:\s*([^\n]+)", log_output, re.MULTILINE):
+    for m in _GENERIC_ERR_RE.finditer(log_output):
         msg = m.group(1).strip()
         # Skip if already captured
-        if any(msg in e["message"] for e in errors):
+        if any(msg in captured_msg for captured_msg in captured):
             continue
         # Skip non-actionable errors
         if any(skip in msg for skip in ["ENOENT", "EACCES", "watch", "EMFILE"]):
             continue
         file = _find_nearby_file(log_output, m.start())
-        errors.append({
+        _add({
             "type": "generic_error",
             "file": file,
             "line": None,
             "message": msg[:300],
         })
 
-    # Deduplicate
-    seen = set()
-    unique_errors = []
-    for e in errors:
-        key = (e["type"], e.get("file"), e["message"][:100])
-        if key not in seen:
-            seen.add(key)
-            unique_errors.append(e)
-
     has_errors = (
-        len(unique_errors) > 0
+        len(errors) > 0
         or "Failed to compile" in log_output
         or "Parsing ecmascript source code failed" in log_output
     )
@@ -214,7 +264,7 @@ def parse_nextjs_errors(log_output: str) -> dict:
     return {
         "has_errors": has_errors,
         "compiled": compiled and not has_errors,
-        "errors": unique_errors,
+        "errors": errors,
     }
 
 
@@ -234,18 +284,23 @@ def parse_runtime_errors(log_output: str) -> dict:
         return {"has_errors": False, "errors": []}
 
     # If we have a LOG_MARKER, only look at content after the LAST marker
-    marker_parts = re.split(r"=== LOG_MARKER_\d+ ===", log_output)
-    if len(marker_parts) > 1:
-        log_output = marker_parts[-1]
+    log_output = _after_last_marker(log_output)
 
     errors = []
+    seen = set()
+
+    def _add(err: dict):
+        key = (err["type"], err.get("file"), err["message"][:100])
+        if key not in seen:
+            seen.add(key)
+            errors.append(err)
 
     # Catch explicit runtime error banners
-    for m in re.finditer(r"(Unhandled Runtime Error|Runtime Error|Unhandled Error)", log_output):
+    for m in _RUNTIME_BANNER_RE.finditer(log_output):
         nearby = log_output[m.start():m.start() + 800]
         msg = _first_error_message(nearby) or m.group(1)
         file, line = _extract_stack_file_line(nearby)
-        errors.append({
+        _add({
             "type": "runtime_error",
             "file": file,
             "line": line,
@@ -253,29 +308,22 @@ def parse_runtime_errors(log_output: str) -> dict:
         })
 
     # Generic Error/TypeError/ReferenceError with stack traces
-    for m in re.finditer(r"\b(TypeError|ReferenceError|RangeError|Error):\s*([^\n]+)", log_output):
-        msg = f"{m.group(1)}: {m.group(2).strip()}"
-        nearby = log_output[m.start():m.start() + 800]
+    for m in _RUNTIME_ERR_RE.finditer(log_output):
+        kind, text = m.groups()
+        msg = f"{kind}: {text.strip()}"
+        start = m.start()
+        nearby = log_output[start:start + 800]
         file, line = _extract_stack_file_line(nearby)
-        errors.append({
+        _add({
             "type": "runtime_error",
             "file": file,
             "line": line,
             "message": msg[:300],
         })
 
-    # Deduplicate
-    seen = set()
-    unique_errors = []
-    for e in errors:
-        key = (e["type"], e.get("file"), e["message"][:100])
-        if key not in seen:
-            seen.add(key)
-            unique_errors.append(e)
-
     return {
-        "has_errors": len(unique_errors) > 0,
-        "errors": unique_errors,
+        "has_errors": len(errors) > 0,
+        "errors": errors,
     }
 
 
@@ -299,6 +347,22 @@ def format_nextjs_errors(parsed: dict) -> str:
     return "\n".join(lines)
 
 
+def _after_last_marker(log_output: str) -> str:
+    """
+    Return the log text after the last `=== LOG_MARKER_<n> ===` line.
+    Scans backwards from the end instead of splitting the whole log.
+    """
+    end = len(log_output)
+    while True:
+        idx = log_output.rfind(_LOG_MARKER_PREFIX, 0, end)
+        if idx < 0:
+            return log_output
+        m = _LOG_MARKER_RE.match(log_output, idx)
+        if m:
+            return log_output[m.end():]
+        end = idx
+
+
 def _extract_project_path(path: str | None) -> str | None:
     """Extract project-relative path from absolute or ./relative path."""
     if not path:
@@ -316,25 +380,44 @@ def _extract_project_path(path: str | None) -> str | None:
 
 def _find_nearby_file(log_output: str, position: int) -> str | None:
     """Try to find a file path near the given position in the log output."""
-    # Look in a 500-char window before the position
+    # Look in a 500-char window before the position. Walk "./" hits from
+    # the right instead of lexing the whole window: the last path match
+    # must start in the run of path characters holding the rightmost valid
+    # hit, so only that run needs a findall.
     start = max(0, position - 500)
-    window = log_output[start:position]
-    files = re.findall(r"(\./[\w/.-]+\.(?:tsx?|jsx?|css))", window)
-    if files:
-        return _extract_project_path(files[-1])
-    return None
+    end = position
+    while True:
+        idx = log_output.rfind("./", start, end)
+        if idx < 0:
+            return None
+        if _NEARBY_FILE_RE.match(log_output, idx, position):
+            break
+        end = idx + 1
+
+    run_start = idx
+    while run_start > start and _is_path_char(log_output[run_start - 1]):
+        run_start -= 1
+    files = _NEARBY_FILE_RE.findall(log_output, run_start, position)
+    return _extract_project_path(files[-1])
+
+
+def _is_path_char(ch: str) -> bool:
+    """Same character class as `[\\w/.-]` in the path patterns."""
+    return ch.isalnum() or ch in "_/.-"
 
 
 def _extract_stack_file_line(text: str) -> tuple[str | None, int | None]:
     """Extract a project-relative file and line from a stack trace snippet."""
     # Absolute path with line/col
-    m = re.search(r"(/[^ )]+?\.(?:tsx?|jsx?|js|ts)):(\d+):(\d+)", text)
+    m = _STACK_ABS_RE.search(text)
     if m:
-        return _extract_project_path(m.group(1)), int(m.group(2))
+        path, line = m.group(1, 2)
+        return _extract_project_path(path), int(line)
     # Relative path with line/col
-    m = re.search(r"(\./[\w/.-]+\.(?:tsx?|jsx?|js|ts)):(\d+):(\d+)", text)
+    m = _STACK_REL_RE.search(text)
     if m:
-        return _extract_project_path(m.group(1)), int(m.group(2))
+        path, line = m.group(1, 2)
+        return _extract_project_path(path), int(line)
     return None, None
 
 
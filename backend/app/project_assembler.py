@@ -8,10 +8,12 @@ Functions:
 """
 
 import asyncio
-import json
+import io
 import os
+from functools import lru_cache
 
 import anthropic
+import orjson
 
 
 # ---------------------------------------------------------------
@@ -340,6 +342,7 @@ Only include files that actually need changes. If no changes needed, output: {}
 No markdown fences. No explanation."""
 
 
+@lru_cache()
 def _get_anthropic_client():
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
@@ -348,6 +351,41 @@ def _get_anthropic_client():
     return anthropic.AsyncAnthropic(api_key=api_key)
 
 
+def _build_file_listing(files: dict, limit: int = 80000) -> str:
+    """
+    Concatenate reviewable files as "=== path ===" blocks, capped at limit chars.
+    Written straight into one buffer and stopped as soon as the cap is passed,
+    so files past the cut are never copied.
+    """
+    buf = io.StringIO()
+    for fp in sorted(files):
+        if not fp.endswith((".jsx", ".js", ".css")):
+            continue
+        if buf.tell():
+            buf.write("\n\n")
+        buf.write(f"=== {fp} ===\n")
+        buf.write(files[fp])
+        if buf.tell() > limit:
+            break
+
+    text = buf.getvalue()
+    if len(text) > limit:
+        text = text[:limit] + "\n\n... (truncated)"
+    return text
+
+
+def _extract_json_object(text: str) -> str:
+    """
+    Slice from the first '{' to the last '}', dropping any markdown fences or
+    prose wrapped around the JSON. Returns "" when there is no object at all.
+    """
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end < start:
+        return ""
+    return text[start:end + 1]
+
+
 async def review_and_fix_assembly(files: dict) -> dict:
     """
     Single Claude call to review all assembled files for cross-component issues.
@@ -356,17 +394,9 @@ async def review_and_fix_assembly(files: dict) -> dict:
     try:
         client = _get_anthropic_client()
 
-        # Build file listing
-        file_listing = []
-        for fp in sorted(files.keys()):
-            if fp.endswith((".jsx", ".js", ".css")):
-                file_listing.append(f"=== {fp} ===\n{files[fp]}")
-        all_files_text = "\n\n".join(file_listing)
-
-        if len(all_files_text) > 80000:
-            all_files_text = all_files_text[:80000] + "\n\n... (truncated)"
+        all_files_text = _build_file_listing(files)
 
-        text = ""
+        chunks = []
         async with client.messages.stream(
             model="claude-sonnet-4-5-20250929",
             max_tokens=32000,
@@ -381,15 +411,14 @@ async def review_and_fix_assembly(files: dict) -> dict:
             }],
         ) as stream:
             async for chunk in stream.text_stream:
-                text += chunk
+                chunks.append(chunk)
 
-        text = text.strip()
-        if text.startswith("```"):
-            text = text.split("\n", 1)[1] if "\n" in text else text[3:]
-        if text.endswith("```"):
-            text = text[:-3]
+        body = _extract_json_object("".join(chunks))
+        if not body:
+            print("  [review-assembly] No JSON object in response — keeping files as-is")
+            return {}
 
-        changes = json.loads(text.strip())
+        changes = orjson.loads(body)
 
         if changes:
             print(f"  [review-assembly] Fixed {len(changes)} files: {list(changes.keys())}")
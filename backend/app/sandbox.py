@@ -7,9 +7,14 @@ A background monitor updates Supabase when sandboxes go down.
 """
 
 import asyncio
+import base64
+import io
 import queue
+import tarfile
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from daytona import Daytona, DaytonaConfig, CreateSandboxFromSnapshotParams
 
@@ -31,8 +36,12 @@ def _get_api_key():
     return api_key
 
 
+@lru_cache()
 def get_daytona_client() -> Daytona:
-    """Get a configured Daytona client."""
+    """
+    Get the shared Daytona client.
+    Built once so every sandbox call reuses the same HTTP connection pool.
+    """
     return Daytona(DaytonaConfig(api_key=_get_api_key()))
 
 
@@ -92,6 +101,20 @@ export default class ErrorBoundary extends Component<Props, State> {
   }
 }'''
 
+# Minimal root layout — replaces the scaffolded one to avoid a Turbopack
+# font resolution error
+MINIMAL_LAYOUT_TSX = (
+    'import "./globals.css";\n'
+    'export const metadata = { title: "Clone", description: "Website clone" };\n'
+    'export default function RootLayout({ children }: { children: React.ReactNode }) {\n'
+    '  return <html lang="en"><body>{children}</body></html>;\n'
+    '}\n'
+)
+
+# Upload payloads, encoded once at import instead of on every sandbox create
+_ERROR_BOUNDARY_BYTES = ERROR_BOUNDARY_TSX.strip().encode("utf-8")
+_MINIMAL_LAYOUT_BYTES = MINIMAL_LAYOUT_TSX.encode("utf-8")
+
 # Extra packages installed on top of what create-next-app provides
 # Keep this minimal — fewer packages = faster sandbox creation + simpler clones
 EXTRA_PACKAGES = [
@@ -152,18 +175,75 @@ _FILES_TO_READ = [
 ]
 
 
+def _poll_delays(budget: float, first: float = 0.25, cap: float = 2.0):
+    """
+    Yield sleep intervals for a readiness poll: start short so a fast
+    dev server is noticed almost immediately, grow towards `cap`, and stop
+    once `budget` seconds have been handed out.
+    """
+    delay, spent = first, 0.0
+    while spent < budget:
+        yield delay
+        spent += delay
+        delay = min(delay * 1.6, cap)
+
+
+def _wait_for_log_line(sandbox, log_file: str, pattern: str, budget: int = 60) -> str:
+    """
+    Block inside the sandbox until `log_file` has a line matching the
+    case-insensitive ERE `pattern`, or `budget` seconds pass — one exec
+    instead of a poll loop. Returns the matched line ("" on timeout).
+    Raises if the exec itself fails so callers can fall back to polling.
+    """
+    result = sandbox.process.exec(
+        f"bash -c \"grep -m1 -iE '{pattern}' "
+        f"<(timeout {budget} tail -n +1 -f {log_file} 2>/dev/null)\"",
+        timeout=budget + 10,
+    )
+    return (result.result or "").strip()
+
+
 def _read_sandbox_files(sandbox, project_root: str) -> dict:
-    """Read key project files from the sandbox and return as {path: content}."""
-    files = {}
-    for fpath in _FILES_TO_READ:
+    """
+    Read key project files from the sandbox and return as {path: content}.
+    All files come back in one exec as a base64'd tarball; missing files are
+    simply absent from the archive. Falls back to one `cat` per file if the
+    batched read fails.
+    """
+    try:
+        result = sandbox.process.exec(
+            f"cd {project_root} && tar -czf - --ignore-failed-read {' '.join(_FILES_TO_READ)} "
+            f"2>/dev/null | base64 -w0",
+            timeout=10,
+        )
+        payload = (result.result or "").strip()
+        if payload:
+            files = {}
+            with tarfile.open(fileobj=io.BytesIO(base64.b64decode(payload)), mode="r:gz") as tar:
+                for member in tar:
+                    if not member.isfile():
+                        continue
+                    content = tar.extractfile(member).read().decode("utf-8", errors="replace").strip()
+                    if content:
+                        files[member.name] = content
+            return files
+    except Exception as e:
+        print(f"  [read-files] Batched read failed, falling back to per-file: {e}")
+    return _read_sandbox_files_each(sandbox, project_root)
+
+
+def _read_sandbox_files_each(sandbox, project_root: str) -> dict:
+    """Read _FILES_TO_READ with one `cat` per file, all in flight at once."""
+    def _cat_one(fpath: str) -> str:
         try:
             result = sandbox.process.exec(f"cat {project_root}/{fpath} 2>/dev/null", timeout=5)
-            content = result.result.strip() if result.result else ""
-            if content:
-                files[fpath] = content
+            return result.result.strip() if result.result else ""
         except Exception:
-            pass
-    return files
+            return ""
+
+    with ThreadPoolExecutor(max_workers=len(_FILES_TO_READ)) as pool:
+        contents = pool.map(_cat_one, _FILES_TO_READ)
+        return {fpath: content for fpath, content in zip(_FILES_TO_READ, contents) if content}
 
 
 async def create_react_boilerplate_sandbox(progress: queue.Queue | None = None) -> dict:
@@ -208,7 +288,9 @@ async def create_react_boilerplate_sandbox(progress: queue.Queue | None = None)
 
             try:
                 _notify("Provisioning cloud sandbox...")
+                snapshot = get_settings().sandbox_snapshot or None
                 params = CreateSandboxFromSnapshotParams(
+                    snapshot=snapshot,
                     language="typescript",
                     public=True,
                     auto_stop_interval=SANDBOX_TTL_MINUTES,
@@ -231,50 +313,49 @@ async def create_react_boilerplate_sandbox(progress: queue.Queue | None = None)
                 else:
                     _notify("WARNING: Sandbox not responsive after 60s — proceeding anyway")
 
-                try:
-                    sandbox.set_autostop_interval(SANDBOX_TTL_MINUTES)
-                    sandbox.set_auto_archive_interval(7 * 24 * 60)
-                except Exception:
-                    pass
-
-                # Install bun & kill stale processes
-                _notify("Installing bun runtime...")
-                _exec(sandbox, "curl -fsSL https://bun.sh/install | bash", timeout=60)
-                sandbox.process.exec("pkill -f next || true; pkill -f bun || true")
-
-                # Scaffold Next.js project (latest — TypeScript + Tailwind + App Router)
-                _notify("Scaffolding Next.js project...")
-                _exec(
-                    sandbox,
-                    f"{BUN_BIN} create next-app@latest {PROJECT_PATH} "
-                    f"--typescript --tailwind --eslint --app --use-bun --yes",
-                    timeout=120,
-                )
+                if snapshot:
+                    # Project, bun and EXTRA_PACKAGES are baked into the snapshot —
+                    # the verification below still repairs anything missing.
+                    _notify(f"Using prebuilt snapshot {snapshot} — skipping scaffold")
+                else:
+                    # Install bun & kill stale processes
+                    _notify("Installing bun runtime...")
+                    _exec(sandbox, "curl -fsSL https://bun.sh/install | bash", timeout=60)
+                    sandbox.process.exec("pkill -f next || true; pkill -f bun || true")
 
-                # Always run explicit bun install — bun create often scaffolds
-                # the project but doesn't reliably finish installing deps.
-                _notify("Installing dependencies...")
-                _exec(sandbox, f"{BUN_BIN} install --cwd {PROJECT_PATH}", timeout=120)
-                time.sleep(3)
-
-                # Install extra packages in batches — one massive bun add
-                # with 33 packages is unreliable and can timeout/partial-fail.
-                batch_size = 10
-                for i in range(0, len(EXTRA_PACKAGES), batch_size):
-                    batch = EXTRA_PACKAGES[i:i + batch_size]
-                    batch_num = (i // batch_size) + 1
-                    total_batches = (len(EXTRA_PACKAGES) + batch_size - 1) // batch_size
-                    _notify(f"Installing packages ({batch_num}/{total_batches})...")
+                    # Scaffold Next.js project (latest — TypeScript + Tailwind + App Router)
+                    _notify("Scaffolding Next.js project...")
                     _exec(
                         sandbox,
-                        f"{BUN_BIN} add --cwd {PROJECT_PATH} {' '.join(batch)}",
+                        f"{BUN_BIN} create next-app@latest {PROJECT_PATH} "
+                        f"--typescript --tailwind --eslint --app --use-bun --yes",
                         timeout=120,
                     )
 
-                # Final bun install to make sure everything is linked properly
-                _notify("Verifying all dependencies...")
-                _exec(sandbox, f"{BUN_BIN} install --cwd {PROJECT_PATH}", timeout=120)
-                time.sleep(2)
+                    # Always run explicit bun install — bun create often scaffolds
+                    # the project but doesn't reliably finish installing deps.
+                    _notify("Installing dependencies...")
+                    _exec(sandbox, f"{BUN_BIN} install --cwd {PROJECT_PATH}", timeout=120)
+                    time.sleep(3)
+
+                    # Install extra packages in batches — one massive bun add
+                    # with 33 packages is unreliable and can timeout/partial-fail.
+                    batch_size = 10
+                    for i in range(0, len(EXTRA_PACKAGES), batch_size):
+                        batch = EXTRA_PACKAGES[i:i + batch_size]
+                        batch_num = (i // batch_size) + 1
+                        total_batches = (len(EXTRA_PACKAGES) + batch_size - 1) // batch_size
+                        _notify(f"Installing packages ({batch_num}/{total_batches})...")
+                        _exec(
+                            sandbox,
+                            f"{BUN_BIN} add --cwd {PROJECT_PATH} {' '.join(batch)}",
+                            timeout=120,
+                        )
+
+                    # Final bun install to make sure everything is linked properly
+                    _notify("Verifying all dependencies...")
+                    _exec(sandbox, f"{BUN_BIN} install --cwd {PROJECT_PATH}", timeout=120)
+                    time.sleep(2)
 
                 # Verify key packages — retry install up to 3 times if next binary is missing
                 for _verify_attempt in range(3):
@@ -291,34 +372,29 @@ async def create_react_boilerplate_sandbox(progress: queue.Queue | None = None)
                 else:
                     raise RuntimeError("next binary still missing after 3 reinstall attempts")
 
-                # Spot-check a few extra packages — reinstall individually if missing
+                # Spot-check a few extra packages — one exec lists the missing ones
+                # (and creates components/ for the ErrorBoundary upload below)
                 spot_check = ["lucide-react", "framer-motion", "clsx"]
-                for pkg in spot_check:
-                    pkg_check = sandbox.process.exec(
-                        f"test -d {PROJECT_PATH}/node_modules/{pkg} && echo OK || echo MISSING",
-                        timeout=10,
-                    )
-                    if "MISSING" in (pkg_check.result or ""):
-                        _notify(f"Package {pkg} missing — reinstalling...")
-                        _exec(sandbox, f"{BUN_BIN} add --cwd {PROJECT_PATH} {pkg}", timeout=60)
+                pkg_check = sandbox.process.exec(
+                    f"mkdir -p {PROJECT_PATH}/components; "
+                    f"for p in {' '.join(spot_check)}; do "
+                    f"test -d {PROJECT_PATH}/node_modules/$p || echo $p; done",
+                    timeout=10,
+                )
+                missing = (pkg_check.result or "").split()
+                if missing:
+                    _notify(f"Packages {', '.join(missing)} missing — reinstalling...")
+                    _exec(sandbox, f"{BUN_BIN} add --cwd {PROJECT_PATH} {' '.join(missing)}", timeout=60)
 
                 # Upload ErrorBoundary component
-                sandbox.process.exec(f"mkdir -p {PROJECT_PATH}/components", timeout=5)
                 sandbox.fs.upload_file(
-                    ERROR_BOUNDARY_TSX.strip().encode("utf-8"),
+                    _ERROR_BOUNDARY_BYTES,
                     f"{PROJECT_PATH}/components/ErrorBoundary.tsx",
                 )
 
                 # Replace default layout.tsx to avoid Turbopack font resolution error
-                _minimal_layout = (
-                    'import "./globals.css";\n'
-                    'export const metadata = { title: "Clone", description: "Website clone" };\n'
-                    'export default function RootLayout({ children }: { children: React.ReactNode }) {\n'
-                    '  return <html lang="en"><body>{children}</body></html>;\n'
-                    '}\n'
-                )
                 sandbox.fs.upload_file(
-                    _minimal_layout.encode("utf-8"),
+                    _MINIMAL_LAYOUT_BYTES,
                     f"{PROJECT_PATH}/app/layout.tsx",
                 )
 
@@ -339,24 +415,50 @@ async def create_react_boilerplate_sandbox(progress: queue.Queue | None = None)
                 # Phase 2: HTTP-based (reliable — confirms server actually serves)
                 _notify("Waiting for compilation...")
                 ready = False
-                for _wait in range(30):
-                    time.sleep(2)
-                    try:
-                        logs = sandbox.process.exec(f"tail -20 {log_file} 2>/dev/null", timeout=10)
-                        log_text = (logs.result or "").lower()
-                        if "ready" in log_text or "compiled" in log_text or "✓ ready" in log_text:
-                            ready = True
-                            _notify(f"Next.js compiled successfully ({(_wait + 1) * 2}s)")
-                            break
-                        if "error" in log_text and "failed to compile" in log_text:
-                            _notify("Next.js has errors but server is running")
-                            ready = True
-                            break
-                    except Exception:
-                        pass
+                t_wait = time.time()
+                try:
+                    # One blocking exec that returns on the first matching log line
+                    line = _wait_for_log_line(
+                        sandbox, log_file, "ready|compiled|failed to compile", budget=60,
+                    ).lower()
+                except Exception as e:
+                    _notify(f"Log wait unavailable ({e}) — polling instead")
+                    line = None
+
+                if line:
+                    ready = True
+                    if "failed to compile" in line:
+                        _notify("Next.js has errors but server is running")
+                    else:
+                        _notify(f"Next.js compiled successfully ({time.time() - t_wait:.1f}s)")
+                elif line is None:
+                    waited = 0.0
+                    for delay in _poll_delays(60):
+                        time.sleep(delay)
+                        waited += delay
+                        try:
+                            logs = sandbox.process.exec(f"tail -20 {log_file} 2>/dev/null", timeout=10)
+                            log_text = (logs.result or "").lower()
+                            if "ready" in log_text or "compiled" in log_text or "✓ ready" in log_text:
+                                ready = True
+                                _notify(f"Next.js compiled successfully ({waited:.1f}s)")
+                                break
+                            if "error" in log_text and "failed to compile" in log_text:
+                                _notify("Next.js has errors but server is running")
+                                ready = True
+                                break
+                        except Exception:
+                            pass
                 if not ready:
                     _notify("Timeout waiting for Next.js logs after 60s — proceeding anyway")
 
+                # Read key project files in the background while the HTTP check
+                # runs. Not any earlier: next dev rewrites tsconfig.json on
+                # startup, which is done by the time it logs ready/compiled.
+                reader = ThreadPoolExecutor(max_workers=1)
+                files_future = reader.submit(_read_sandbox_files, sandbox, PROJECT_PATH)
+                reader.shutdown(wait=False)
+
                 # Phase 2: HTTP health check — verify the page actually serves
                 _notify("Verifying HTTP readiness...")
                 http_ok = False
@@ -381,8 +483,7 @@ async def create_react_boilerplate_sandbox(progress: queue.Queue | None = None)
                 preview_url = _get_iframe_preview_url(sandbox, 3000)
                 _notify(f"Sandbox ID: {sandbox.id} — Preview URL: {preview_url}")
 
-                # Read key project files
-                initial_files = _read_sandbox_files(sandbox, PROJECT_PATH)
+                initial_files = files_future.result()
                 _notify(f"Sandbox ready — {len(initial_files)} files loaded")
 
                 return {
@@ -436,6 +537,8 @@ async def stop_sandbox(sandbox_id: str, delete: bool = False):
         from app.database import _get_client as get_db
         db = get_db()
         db.table("clones").update({"is_active": False}).eq("sandbox_id", sandbox_id).execute()
+        from app.cache import invalidate_clone
+        invalidate_clone()
     except Exception as e:
         print(f"[stop_sandbox] DB update failed: {e}")
 
@@ -525,43 +628,47 @@ async def _sandbox_monitor_loop():
 
             print(f"[sandbox-monitor] Checking {len(sandbox_ids)} sandbox(es)...")
 
-            for sid in sandbox_ids:
+            # Check if each sandbox is still reachable — all at once
+            def _check(sandbox_id):
                 try:
-                    info = active_sandboxes.get(sid, {})
-                    created_at = info.get("created_at", 0)
-                    age_minutes = (time.time() - created_at) / 60 if created_at else 0
-
-                    # Check if sandbox is still reachable
-                    def _check(sandbox_id=sid):
-                        try:
-                            daytona = get_daytona_client()
-                            sandbox = daytona.get(sandbox_id)
-                            # If we can get it, it's still alive
-                            return True
-                        except Exception:
-                            return False
-
-                    is_alive = await asyncio.to_thread(_check)
-
-                    if not is_alive:
-                        print(f"[sandbox-monitor] {sid[:12]} is stopped/gone — marking inactive")
-                        active_sandboxes.pop(sid, None)
-
-                        # Update Supabase
-                        try:
-                            from app.database import _get_client as get_db
-                            db = get_db()
-                            db.table("clones").update(
-                                {"is_active": False}
-                            ).eq("sandbox_id", sid).execute()
-                        except Exception as e:
-                            print(f"[sandbox-monitor] DB update failed for {sid[:12]}: {e}")
-
-                    elif age_minutes > 0:
-                        print(f"[sandbox-monitor] {sid[:12]} alive ({age_minutes:.0f}m old)")
-
+                    get_daytona_client().get(sandbox_id)
+                    # If we can get it, it's still alive
+                    return True
+                except Exception:
+                    return False
+
+            results = await asyncio.gather(
+                *(asyncio.to_thread(_check, sid) for sid in sandbox_ids),
+                return_exceptions=True,
+            )
+
+            dead = []
+            for sid, is_alive in zip(sandbox_ids, results):
+                if isinstance(is_alive, BaseException):
+                    print(f"[sandbox-monitor] Error checking {sid[:12]}: {is_alive}")
+                    continue
+                if not is_alive:
+                    print(f"[sandbox-monitor] {sid[:12]} is stopped/gone — marking inactive")
+                    active_sandboxes.pop(sid, None)
+                    dead.append(sid)
+                    continue
+                created_at = active_sandboxes.get(sid, {}).get("created_at", 0)
+                if created_at:
+                    age_minutes = (time.time() - created_at) / 60
+                    print(f"[sandbox-monitor] {sid[:12]} alive ({age_minutes:.0f}m old)")
+
+            # Update Supabase — one write for every dead sandbox
+            if dead:
+                try:
+                    from app.database import _get_client as get_db
+                    db = get_db()
+                    db.table("clones").update(
+                        {"is_active": False}
+                    ).in_("sandbox_id", dead).execute()
+                    from app.cache import invalidate_clone
+                    invalidate_clone()
                 except Exception as e:
-                    print(f"[sandbox-monitor] Error checking {sid[:12]}: {e}")
+                    print(f"[sandbox-monitor] DB update failed for {len(dead)} sandbox(es): {e}")
 
         except Exception as e:
             print(f"[sandbox-monitor] Loop error: {e}")
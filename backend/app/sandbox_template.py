@@ -10,6 +10,8 @@ import os
 import time as _time
 
 from app.sandbox import (
+    _poll_delays,
+    _wait_for_log_line,
     create_react_boilerplate_sandbox,
     get_daytona_client,
     PROJECT_PATH,
@@ -219,19 +221,14 @@ async def provision_react_sandbox_from_template() -> dict:
             import time as _t2
             _t2.sleep(2)
 
-        # Belt-and-suspenders: explicitly set intervals
-        try:
-            sandbox.set_autostop_interval(0)
-            sandbox.set_auto_archive_interval(7 * 24 * 60)
-        except Exception:
-            pass
-
-        # Upload all template files
+        # Upload all template files — one mkdir for every parent dir, then uploads
+        dirs = {
+            "/".join(f"{project_root}/{filepath}".split("/")[:-1])
+            for filepath in TEMPLATE_FILES
+        }
+        sandbox.process.exec(f"mkdir -p {' '.join(sorted(dirs))}", timeout=15)
         for filepath, content in TEMPLATE_FILES.items():
-            full_path = f"{project_root}/{filepath}"
-            dir_path = "/".join(full_path.split("/")[:-1])
-            sandbox.process.exec(f"mkdir -p {dir_path}", timeout=5)
-            sandbox.fs.upload_file(content.encode("utf-8"), full_path)
+            sandbox.fs.upload_file(content.encode("utf-8"), f"{project_root}/{filepath}")
 
         # Install dependencies
         print("  [template] Running npm install...")
@@ -248,21 +245,27 @@ async def provision_react_sandbox_from_template() -> dict:
             f"> {log_file} 2>&1 &"
         )
 
-        # Wait for dev server to be ready
+        # Wait for dev server to be ready — one blocking exec, polling as fallback
         ready = False
-        for _ in range(30):
-            _time.sleep(2)
-            try:
-                logs = sandbox.process.exec(
-                    f"tail -20 {log_file} 2>/dev/null", timeout=5
-                )
-                log_text = (logs.result or "").lower()
-                if "ready" in log_text or "compiled" in log_text:
-                    ready = True
-                    print("  [template] Next.js compiled successfully")
-                    break
-            except Exception:
-                pass
+        try:
+            ready = bool(_wait_for_log_line(sandbox, log_file, "ready|compiled", budget=60))
+            if ready:
+                print("  [template] Next.js compiled successfully")
+        except Exception as e:
+            print(f"  [template] Log wait unavailable ({e}) — polling instead")
+            for delay in _poll_delays(60):
+                _time.sleep(delay)
+                try:
+                    logs = sandbox.process.exec(
+                        f"tail -20 {log_file} 2>/dev/null", timeout=5
+                    )
+                    log_text = (logs.result or "").lower()
+                    if "ready" in log_text or "compiled" in log_text:
+                        ready = True
+                        print("  [template] Next.js compiled successfully")
+                        break
+                except Exception:
+                    pass
         if not ready:
             print("  [template] Timeout waiting for Next.js — proceeding anyway")
 
@@ -285,42 +288,70 @@ async def provision_react_sandbox_from_template() -> dict:
 
 # ── Utility Functions ────────────────────────────────────────────────────────
 
-async def upload_files_to_sandbox(sandbox_id: str, files: dict, project_root: str = None):
+async def upload_files_to_sandbox(sandbox_id: str, files: dict, project_root: str = None,
+                                  concurrency: int = 8):
     """
     Upload multiple files to a Daytona sandbox.
     Creates directories as needed. Retries on transient errors.
+    Files are uploaded concurrently (bounded by `concurrency`) — each upload
+    is its own round-trip to Daytona, so doing them one by one dominates
+    rebuilds and large fix batches.
     """
     if not project_root:
         project_root = PROJECT_PATH
 
-    def _upload():
-        last_err = None
-        for attempt in range(4):
-            try:
-                daytona = get_daytona_client()
-                sb = daytona.get(sandbox_id)
-
-                # Batch: create all needed directories in one command
-                dirs = set()
-                for fp in files:
-                    full_path = f"{project_root}/{fp}"
-                    dirs.add("/".join(full_path.split("/")[:-1]))
-                if dirs:
-                    sb.process.exec(f"mkdir -p {' '.join(dirs)}", timeout=15)
-
-                # Upload all files (no per-file mkdir)
-                for fp, content in files.items():
-                    sb.fs.upload_file(content.encode("utf-8"), f"{project_root}/{fp}")
-                return  # success
-            except Exception as e:
-                last_err = e
-                print(f"  [upload] Attempt {attempt+1}/4 failed: {e}")
-                if attempt < 3:
-                    wait = 5 * (attempt + 1)  # 5s, 10s, 15s
-                    _time.sleep(wait)
-        raise last_err
+    semaphore = asyncio.Semaphore(concurrency)
 
-    await asyncio.to_thread(_upload)
+    def _prepare():
+        daytona = get_daytona_client()
+        sb = daytona.get(sandbox_id)
+
+        # Batch: create all needed directories in one command
+        dirs = set()
+        for fp in files:
+            full_path = f"{project_root}/{fp}"
+            dirs.add("/".join(full_path.split("/")[:-1]))
+        if dirs:
+            sb.process.exec(f"mkdir -p {' '.join(dirs)}", timeout=15)
+        return sb
+
+    def _upload_single(sb, full_path: str, data: bytes):
+        sb.fs.upload_file(data, full_path)
+
+    async def _upload_one(sb, fp: str, data: bytes):
+        async with semaphore:
+            await asyncio.to_thread(_upload_single, sb, f"{project_root}/{fp}", data)
+
+    # Encode once up front so retries don't re-encode every file.
+    # Files drop out of `pending` as they succeed, so a retry only
+    # re-sends the uploads that actually failed.
+    pending = {fp: content.encode("utf-8") for fp, content in files.items()}
+
+    last_err = None
+    for attempt in range(4):
+        try:
+            sb = await asyncio.to_thread(_prepare)
+            items = list(pending.items())
+            results = await asyncio.gather(
+                *(_upload_one(sb, fp, data) for fp, data in items),
+                return_exceptions=True,
+            )
+            errors = []
+            for (fp, _data), r in zip(items, results):
+                if isinstance(r, Exception):
+                    errors.append(r)
+                else:
+                    del pending[fp]
+            if errors:
+                raise errors[0]
+            return  # success
+        except Exception as e:
+            last_err = e
+            print(f"  [upload] Attempt {attempt+1}/4 failed ({len(pending)} files left): {e}")
+            if attempt < 3:
+                wait = 5 * (attempt + 1)  # 5s, 10s, 15s
+                await asyncio.sleep(wait)
+    raise last_err
 
 
 async def get_sandbox_logs(
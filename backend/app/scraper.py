@@ -10,13 +10,14 @@ import asyncio
 import base64
 import io
 import json
+import re
 import time as _time
 from urllib.parse import urlparse, urljoin
 
 from PIL import Image
 from playwright.async_api import async_playwright, Route, Request
 
-from app.image_utils import screenshot_to_b64
+from app.image_utils import screenshot_to_b64, perceptual_hash, hash_distance
 
 try:
     from playwright_stealth import Stealth
@@ -33,6 +34,296 @@ EXTRACTION_TIME_BUDGET = 90
 # If exceeded, stop early and proceed with whatever data was collected.
 SCRAPE_TIME_LIMIT = 60
 
+# Requests aborted at the route handler. They are still recorded in the
+# network log, but never downloaded: media/streams are irrelevant to the
+# asset manifest and tracker scripts only add bandwidth and main-thread work.
+_BLOCKED_RESOURCE_TYPES = frozenset({"media", "websocket", "eventsource", "manifest"})
+_BLOCKED_HOST_RE = re.compile(
+    r"(?:^|\.)(?:doubleclick\.net|googletagmanager\.com|google-analytics\.com"
+    r"|connect\.facebook\.net|hotjar\.com|cdn\.segment\.com|api\.segment\.io"
+    r"|widget\.intercom\.io|intercomcdn\.com|mixpanel\.com)$"
+)
+
+
+# One Chromium per worker process, shared by every scrape. Each scrape gets
+# its own BrowserContext (cookies/cache/routes are per-context), so only the
+# ~1s browser cold start is shared.
+_playwright = None
+_browser = None
+_browser_lock = asyncio.Lock()
+
+
+async def _get_browser():
+    """Return the shared browser, launching (or relaunching after a crash) as needed."""
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            _browser = await _playwright.chromium.launch(headless=True)
+            print("  [scrape] Launched shared browser")
+        return _browser
+
+
+async def close_browser():
+    """Shut down the shared browser and Playwright driver (called on app shutdown)."""
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is not None:
+            try:
+                await _browser.close()
+            except Exception as e:
+                print(f"  [scrape] Browser close failed: {e}")
+        if _playwright is not None:
+            await _playwright.stop()
+        _browser = None
+        _playwright = None
+
+
+def _batched_js(pieces: dict) -> str:
+    """
+    Combine several zero-argument extraction functions into one script.
+
+    Each piece runs in its own try/catch so a failure in one doesn't lose
+    the others — it comes back as {"error": message} instead of {"ok": value}.
+    """
+    calls = "\n".join(
+        f"try {{ out[{json.dumps(name)}] = {{ ok: ({js})() }}; }} "
+        f"catch (e) {{ out[{json.dumps(name)}] = {{ error: String(e) }}; }}"
+        for name, js in pieces.items()
+    )
+    return f"() => {{\nconst out = {{}};\n{calls}\nreturn out;\n}}"
+
+
+async def _evaluate_batch(page, script: str, defaults: dict) -> dict:
+    """
+    Run a _batched_js script and unpack it, falling back to the default
+    for any piece that threw (or for everything, if the evaluate itself failed).
+    """
+    try:
+        raw = await page.evaluate(script) or {}
+    except Exception as e:
+        print(f"  [scrape] Batched extraction failed: {e}")
+        raw = {}
+
+    results = {}
+    for name, default in defaults.items():
+        entry = raw.get(name) or {}
+        value = entry.get("ok")
+        if value is None:
+            print(f"  [scrape] {name} extraction failed: {entry.get('error', 'no result')}")
+            value = default
+        results[name] = value
+    return results
+
+
+_DOM_IMAGES_JS = '''() => {
+    return [...document.querySelectorAll('img')]
+        .filter(img => img.src && img.offsetWidth > 0)
+        .map(img => ({
+            url: img.src,
+            alt: img.alt || '',
+            width: img.naturalWidth,
+            height: img.naturalHeight
+        }));
+}'''
+
+_FONT_FAMILIES_JS = '''() => {
+    const families = new Set();
+    for (const sheet of document.styleSheets) {
+        try {
+            for (const rule of sheet.cssRules) {
+                if (rule instanceof CSSFontFaceRule) {
+                    families.add(rule.style.fontFamily.replace(/['"]/g, ''));
+                }
+            }
+        } catch(e) {}
+    }
+    return [...families];
+}'''
+
+_THEME_JS = '''() => {
+    const result = { colors: {}, fonts: {} };
+
+    function rgbToHex(rgb) {
+        if (!rgb || rgb === 'transparent' || rgb === 'rgba(0, 0, 0, 0)') return null;
+        const match = rgb.match(/rgba?\\((\\d+),\\s*(\\d+),\\s*(\\d+)/);
+        if (!match) return rgb;
+        return '#' + [match[1], match[2], match[3]]
+            .map(x => parseInt(x).toString(16).padStart(2, '0'))
+            .join('');
+    }
+
+    // Walk up to find effective background
+    function getEffectiveBg(el) {
+        let current = el;
+        while (current && current !== document.documentElement) {
+            const hex = rgbToHex(getComputedStyle(current).backgroundColor);
+            if (hex) return hex;
+            current = current.parentElement;
+        }
+        return null;
+    }
+
+    const body = document.body;
+    const bs = getComputedStyle(body);
+    // Effective body background: walk up from body to html
+    result.colors.body_bg = getEffectiveBg(body) || rgbToHex(getComputedStyle(document.documentElement).backgroundColor) || '#ffffff';
+
+    // Every sample below comes from ONE tree walk over the union of their
+    // selectors; each element is classified with matches() and its computed
+    // style is read once, instead of a querySelectorAll pass per category
+    // Text: elements that actually contain readable text
+    const TEXT_SEL = 'p, span, li, td, a, h1, h2, h3, h4, h5, h6, label, blockquote';
+    // Backgrounds: broad container search, including nested containers
+    const BG_SEL = 'section, header, footer, nav, main, [class*="hero"], [class*="section"], body > div > div, [class*="card"], [class*="container"]';
+    const HEADING_SEL = 'h1, h2, h3, h4';
+    // Link/button accent colors
+    const ACCENT_SEL = 'a, button, [role="button"]';
+    // Border and shadow colors (for cards)
+    const BORDER_SEL = '[class*="card"], [class*="border"], section > div > div';
+
+    const textColorMap = {};
+    const bgSet = new Set();
+    const textSet = new Set();
+    const headingColorSet = new Set();
+    const accentSet = new Set();
+    const borderSet = new Set();
+
+    const candidates = document.querySelectorAll(
+        [TEXT_SEL, BG_SEL, HEADING_SEL, ACCENT_SEL, BORDER_SEL].join(', ')
+    );
+    for (const el of candidates) {
+        const s = getComputedStyle(el);
+
+        if (el.matches(BG_SEL)) {
+            const bg = rgbToHex(s.backgroundColor);
+            if (bg) bgSet.add(bg);
+            // Also check for gradients
+            if (s.backgroundImage && s.backgroundImage !== 'none' && s.backgroundImage.includes('gradient')) {
+                bgSet.add(s.backgroundImage.slice(0, 200));
+            }
+        }
+
+        // Everything else only samples visible elements
+        if (!el.offsetWidth) continue;
+
+        // Sample REAL text colors instead of body.color — only leaf-ish
+        // elements (skip containers with many children) with actual text
+        if (el.matches(TEXT_SEL) && el.children.length <= 5 && el.innerText.trim().length >= 2) {
+            const color = rgbToHex(s.color);
+            if (color) textColorMap[color] = (textColorMap[color] || 0) + 1;
+        }
+
+        if (el.matches(HEADING_SEL)) {
+            const hc = rgbToHex(s.color);
+            if (hc) headingColorSet.add(hc);
+        }
+
+        if (el.matches(ACCENT_SEL)) {
+            const bg = rgbToHex(s.backgroundColor);
+            if (bg) accentSet.add(bg);
+            const color = rgbToHex(s.color);
+            if (color) accentSet.add(color);
+        }
+
+        if (el.matches(BORDER_SEL)) {
+            const bc = rgbToHex(s.borderColor);
+            if (bc) borderSet.add(bc);
+            if (s.boxShadow && s.boxShadow !== 'none') {
+                result.colors.box_shadow_sample = s.boxShadow.slice(0, 150);
+            }
+        }
+    }
+
+    // Most common text color is the "body text" color
+    const sortedTextColors = Object.entries(textColorMap).sort((a, b) => b[1] - a[1]);
+    result.colors.body_text = sortedTextColors.length > 0 ? sortedTextColors[0][0] : rgbToHex(bs.color);
+
+    // Text colors from real visible text
+    for (const [color] of sortedTextColors.slice(0, 10)) {
+        textSet.add(color);
+    }
+
+    result.colors.backgrounds = [...bgSet].slice(0, 10);
+    result.colors.text_colors = [...textSet].slice(0, 10);
+    result.colors.heading_colors = [...headingColorSet].slice(0, 5);
+    result.colors.accent_colors = [...accentSet].slice(0, 8);
+    result.colors.border_colors = [...borderSet].slice(0, 5);
+
+    result.fonts.body = bs.fontFamily;
+    result.fonts.body_size = bs.fontSize;
+    result.fonts.body_weight = bs.fontWeight;
+
+    const h1 = document.querySelector('h1');
+    if (h1) {
+        const h1s = getComputedStyle(h1);
+        result.fonts.heading = h1s.fontFamily;
+        result.fonts.heading_size = h1s.fontSize;
+        result.fonts.heading_weight = h1s.fontWeight;
+        result.fonts.heading_letter_spacing = h1s.letterSpacing;
+    }
+
+    return result;
+}'''
+
+_SVGS_JS = '''() => {
+    // Broader SVG search: look everywhere including inside containers
+    const allSvgs = [...document.querySelectorAll('svg')];
+
+    return allSvgs
+        .filter(svg => {
+            const r = svg.getBoundingClientRect();
+            // Accept SVGs that are at least 5x5 (catches small icons too)
+            return r.width > 5 && r.height > 5;
+        })
+        .slice(0, 25)
+        .map((svg, i) => {
+            const r = svg.getBoundingClientRect();
+            // Detect role: logo, icon, decorative
+            let role = 'decorative';
+            if (svg.closest('nav, header, [class*="nav"]')) role = 'logo';
+            else if (r.width <= 32 && r.height <= 32) role = 'icon';
+            else if (svg.closest('button, a, [role="button"]')) role = 'icon';
+
+            return {
+                id: svg.id || svg.getAttribute('aria-label') || svg.closest('[aria-label]')?.getAttribute('aria-label') || `svg-${i}`,
+                markup: svg.outerHTML.slice(0, 2000),
+                width: Math.round(r.width),
+                height: Math.round(r.height),
+                role: role,
+            };
+        });
+}'''
+
+_TEXT_CONTENT_JS = '''() => {
+    return document.body.innerText.slice(0, 8000);
+}'''
+
+_META_JS = '''() => {
+    return {
+        title: document.title,
+        description: document.querySelector('meta[name="description"]')?.content || '',
+        og_image: document.querySelector('meta[property="og:image"]')?.content || '',
+        favicon: document.querySelector('link[rel="icon"]')?.href ||
+                 document.querySelector('link[rel="shortcut icon"]')?.href || ''
+    };
+}'''
+
+# Extraction steps with no time-budget check between them share a single
+# page.evaluate round-trip over the Playwright pipe.
+_ASSETS_THEME_JS = _batched_js({
+    "dom_images": _DOM_IMAGES_JS,
+    "font_families": _FONT_FAMILIES_JS,
+    "theme": _THEME_JS,
+})
+
+_SVGS_TEXT_META_JS = _batched_js({
+    "svgs": _SVGS_JS,
+    "text_content": _TEXT_CONTENT_JS,
+    "meta": _META_JS,
+})
+
 
 async def scrape_website(url: str, on_progress=None) -> dict:
     """
@@ -55,9 +346,14 @@ async def scrape_website(url: str, on_progress=None) -> dict:
 
     # Collect all network requests
     network_requests = []
+    last_request_at = _time.monotonic()
+    # Don't block a tracker vendor's own hosts when cloning their site
+    block_trackers = not _BLOCKED_HOST_RE.search(urlparse(url).hostname or "")
 
     async def handle_route(route: Route):
-        """Intercept and log all network requests, then continue."""
+        """Log every network request, then continue it (or abort it if non-essential)."""
+        nonlocal last_request_at
+        last_request_at = _time.monotonic()
         request = route.request
         resource_type = request.resource_type
         req_url = request.url
@@ -68,18 +364,23 @@ async def scrape_website(url: str, on_progress=None) -> dict:
             "method": request.method,
         })
 
-        await route.continue_()
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-        )
+        if resource_type in _BLOCKED_RESOURCE_TYPES or (
+            block_trackers and _BLOCKED_HOST_RE.search(urlparse(req_url).hostname or "")
+        ):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    browser = await _get_browser()
+    context = await browser.new_context(
+        viewport={"width": 1920, "height": 1080},
+        user_agent=(
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/131.0.0.0 Safari/537.36"
+        ),
+    )
+    try:
         page = await context.new_page()
 
         # Apply stealth to avoid bot detection
@@ -89,16 +390,21 @@ async def scrape_website(url: str, on_progress=None) -> dict:
         # Intercept ALL requests
         await page.route("**/*", handle_route)
 
-        # Navigate — use shorter timeout, fallback quickly
+        # Navigate — networkidle never fires on pages with long-polling or
+        # ads, so wait for the DOM, give "load" a bounded chance, then use
+        # our own capped network-idle on top of the route interception
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=15000)
+        except Exception as e:
+            raise Exception(f"Failed to load {url}: {e}")
         try:
-            await page.goto(url, wait_until="networkidle", timeout=15000)
+            await page.wait_for_load_state("load", timeout=5000)
         except Exception:
-            try:
-                await page.goto(url, wait_until="domcontentloaded", timeout=10000)
-                await page.wait_for_timeout(2000)
-            except Exception as e2:
-                await browser.close()
-                raise Exception(f"Failed to load {url}: {e2}")
+            pass
+        settle_deadline = _time.monotonic() + 5
+        while (_time.monotonic() - last_request_at < 0.5
+               and _time.monotonic() < settle_deadline):
+            await asyncio.sleep(0.1)
 
         # Clean up page
         await prepare_page(page)
@@ -154,35 +460,33 @@ async def scrape_website(url: str, on_progress=None) -> dict:
                     "type": "application/javascript",
                 })
 
-        # Also catch images in <img> tags (CSS/lazy-loaded)
-        try:
-            dom_images = await page.evaluate('''() => {
-                return [...document.querySelectorAll('img')]
-                    .filter(img => img.src && img.offsetWidth > 0)
-                    .map(img => ({
-                        url: img.src,
-                        alt: img.alt || '',
-                        width: img.naturalWidth,
-                        height: img.naturalHeight
-                    }));
-            }''')
-        except Exception as e:
-            print(f"  [scrape] DOM images extraction failed: {e}")
-            dom_images = []
+        # === EXTRACT DOM IMAGES, FONT FAMILIES, THEME ===
+        # One page.evaluate round-trip for <img> tags (CSS/lazy-loaded),
+        # @font-face families and computed-style theme
+        extracted = await _evaluate_batch(page, _ASSETS_THEME_JS, {
+            "dom_images": [],
+            "font_families": [],
+            "theme": {"colors": {}, "fonts": {}},
+        })
+        dom_images = extracted["dom_images"]
+        font_families = extracted["font_families"]
+        theme = extracted["theme"]
 
         await _emit(f"Analyzing assets ({len(assets['images'])} images, {len(assets['fonts'])} fonts)...")
 
         # Merge DOM images with network images (dedup by URL)
-        image_urls = set(a["url"] for a in assets["images"])
+        image_urls = {a["url"] for a in assets["images"]}
         for img in dom_images:
-            if img["url"] not in image_urls and not img["url"].startswith("data:"):
+            img_url = img["url"]
+            if img_url not in image_urls and not img_url.startswith("data:"):
                 assets["images"].append({
-                    "url": img["url"],
+                    "url": img_url,
                     "type": "image",
                     "alt": img.get("alt", ""),
                     "width": img.get("width"),
                     "height": img.get("height"),
                 })
+                image_urls.add(img_url)
 
         # === EXTRACT GOOGLE FONTS from network requests ===
         google_font_urls = [
@@ -190,156 +494,15 @@ async def scrape_website(url: str, on_progress=None) -> dict:
             if "fonts.googleapis.com" in req["url"] and req["resource_type"] == "stylesheet"
         ]
 
-        # === EXTRACT FONT FAMILIES from @font-face rules ===
-        try:
-            font_families = await page.evaluate('''() => {
-                const families = new Set();
-                for (const sheet of document.styleSheets) {
-                    try {
-                        for (const rule of sheet.cssRules) {
-                            if (rule instanceof CSSFontFaceRule) {
-                                families.add(rule.style.fontFamily.replace(/['"]/g, ''));
-                            }
-                        }
-                    } catch(e) {}
-                }
-                return [...families];
-            }''')
-        except Exception as e:
-            print(f"  [scrape] Font families extraction failed: {e}")
-            font_families = []
-
         # Attach family names to font assets where possible
+        family_keys = [(family, family.lower().replace(" ", "")) for family in font_families]
         for font_asset in assets["fonts"]:
-            font_url = font_asset["url"].lower()
-            for family in font_families:
-                if family.lower().replace(" ", "") in font_url.lower().replace(" ", ""):
+            font_url = font_asset["url"].lower().replace(" ", "")
+            for family, key in family_keys:
+                if key in font_url:
                     font_asset["family"] = family
                     break
 
-        # === EXTRACT THEME (computed styles) ===
-        # Theme is essential — always extract (fast: single page.evaluate)
-        try:
-            theme = await page.evaluate('''() => {
-            const result = { colors: {}, fonts: {} };
-
-            function rgbToHex(rgb) {
-                if (!rgb || rgb === 'transparent' || rgb === 'rgba(0, 0, 0, 0)') return null;
-                const match = rgb.match(/rgba?\\((\\d+),\\s*(\\d+),\\s*(\\d+)/);
-                if (!match) return rgb;
-                return '#' + [match[1], match[2], match[3]]
-                    .map(x => parseInt(x).toString(16).padStart(2, '0'))
-                    .join('');
-            }
-
-            // Walk up to find effective background
-            function getEffectiveBg(el) {
-                let current = el;
-                while (current && current !== document.documentElement) {
-                    const hex = rgbToHex(getComputedStyle(current).backgroundColor);
-                    if (hex) return hex;
-                    current = current.parentElement;
-                }
-                return null;
-            }
-
-            const body = document.body;
-            const bs = getComputedStyle(body);
-            // Effective body background: walk up from body to html
-            result.colors.body_bg = getEffectiveBg(body) || rgbToHex(getComputedStyle(document.documentElement).backgroundColor) || '#ffffff';
-
-            // Sample REAL text colors from visible elements instead of body.color
-            const textColorMap = {};
-            // Target elements that actually contain readable text
-            const textSamples = document.querySelectorAll('p, span, li, td, a, h1, h2, h3, h4, h5, h6, label, blockquote');
-            for (const el of textSamples) {
-                if (!el.offsetWidth || !el.innerText.trim()) continue;
-                // Only leaf-ish elements — skip containers with many children
-                if (el.children.length > 5) continue;
-                // Must have actual visible text (not just whitespace)
-                const text = el.innerText.trim();
-                if (text.length < 2) continue;
-                const color = rgbToHex(getComputedStyle(el).color);
-                if (color) textColorMap[color] = (textColorMap[color] || 0) + 1;
-            }
-            // Most common text color is the "body text" color
-            const sortedTextColors = Object.entries(textColorMap).sort((a, b) => b[1] - a[1]);
-            result.colors.body_text = sortedTextColors.length > 0 ? sortedTextColors[0][0] : rgbToHex(bs.color);
-
-            const bgSet = new Set();
-            const textSet = new Set();
-            const headingColorSet = new Set();
-
-            // Broader element search for backgrounds — include nested containers
-            document.querySelectorAll('section, header, footer, nav, main, [class*="hero"], [class*="section"], body > div > div, [class*="card"], [class*="container"]').forEach(el => {
-                const s = getComputedStyle(el);
-                const bg = rgbToHex(s.backgroundColor);
-                if (bg) bgSet.add(bg);
-                // Also check for gradients
-                if (s.backgroundImage && s.backgroundImage !== 'none' && s.backgroundImage.includes('gradient')) {
-                    bgSet.add(s.backgroundImage.slice(0, 200));
-                }
-            });
-
-            // Text colors from real visible text
-            for (const [color] of sortedTextColors.slice(0, 10)) {
-                textSet.add(color);
-            }
-
-            document.querySelectorAll('h1, h2, h3, h4').forEach(h => {
-                if (!h.offsetWidth) return;
-                const hc = rgbToHex(getComputedStyle(h).color);
-                if (hc) headingColorSet.add(hc);
-            });
-
-            // Also capture link/button accent colors
-            const accentSet = new Set();
-            document.querySelectorAll('a, button, [role="button"]').forEach(el => {
-                if (!el.offsetWidth) return;
-                const s = getComputedStyle(el);
-                const bg = rgbToHex(s.backgroundColor);
-                if (bg) accentSet.add(bg);
-                const color = rgbToHex(s.color);
-                if (color) accentSet.add(color);
-            });
-
-            result.colors.backgrounds = [...bgSet].slice(0, 10);
-            result.colors.text_colors = [...textSet].slice(0, 10);
-            result.colors.heading_colors = [...headingColorSet].slice(0, 5);
-            result.colors.accent_colors = [...accentSet].slice(0, 8);
-
-            // Border and shadow colors (for cards)
-            const borderSet = new Set();
-            document.querySelectorAll('[class*="card"], [class*="border"], section > div > div').forEach(el => {
-                if (!el.offsetWidth) return;
-                const s = getComputedStyle(el);
-                const bc = rgbToHex(s.borderColor);
-                if (bc) borderSet.add(bc);
-                if (s.boxShadow && s.boxShadow !== 'none') {
-                    result.colors.box_shadow_sample = s.boxShadow.slice(0, 150);
-                }
-            });
-            result.colors.border_colors = [...borderSet].slice(0, 5);
-
-            result.fonts.body = bs.fontFamily;
-            result.fonts.body_size = bs.fontSize;
-            result.fonts.body_weight = bs.fontWeight;
-
-            const h1 = document.querySelector('h1');
-            if (h1) {
-                const h1s = getComputedStyle(h1);
-                result.fonts.heading = h1s.fontFamily;
-                result.fonts.heading_size = h1s.fontSize;
-                result.fonts.heading_weight = h1s.fontWeight;
-                result.fonts.heading_letter_spacing = h1s.letterSpacing;
-            }
-
-            return result;
-        }''')
-        except Exception as e:
-            print(f"  [scrape] Theme extraction failed: {e}")
-            theme = {"colors": {}, "fonts": {}}
-
         theme.setdefault("fonts", {})["google_font_urls"] = google_font_urls
         theme.setdefault("fonts", {})["custom_fonts"] = font_families
 
@@ -347,7 +510,6 @@ async def scrape_website(url: str, on_progress=None) -> dict:
 
         if _budget_left() < 3:
             print(f"  [scrape] Time budget exhausted ({_budget_left():.1f}s) — skipping remaining extraction")
-            await browser.close()
             return _partial_result(url, meta={"title": "", "description": "", "og_image": "", "favicon": ""},
                                    assets=assets, theme=theme)
 
@@ -435,69 +597,21 @@ async def scrape_website(url: str, on_progress=None) -> dict:
             print(f"  [scrape] Time budget exhausted ({_budget_left():.1f}s) — skipping SVGs, sections, screenshots")
             meta = await _safe_extract_meta(page)
             text_content = ""
-            await browser.close()
             return _partial_result(url, meta=meta, assets=assets, theme=theme, clickables=clickables)
 
-        # === EXTRACT SVGs ===
-        try:
-            svgs = await page.evaluate('''() => {
-            // Broader SVG search: look everywhere including inside containers
-            const allSvgs = [...document.querySelectorAll('svg')];
-
-            return allSvgs
-                .filter(svg => {
-                    const r = svg.getBoundingClientRect();
-                    // Accept SVGs that are at least 5x5 (catches small icons too)
-                    return r.width > 5 && r.height > 5;
-                })
-                .slice(0, 25)
-                .map((svg, i) => {
-                    const r = svg.getBoundingClientRect();
-                    // Detect role: logo, icon, decorative
-                    let role = 'decorative';
-                    if (svg.closest('nav, header, [class*="nav"]')) role = 'logo';
-                    else if (r.width <= 32 && r.height <= 32) role = 'icon';
-                    else if (svg.closest('button, a, [role="button"]')) role = 'icon';
-
-                    return {
-                        id: svg.id || svg.getAttribute('aria-label') || svg.closest('[aria-label]')?.getAttribute('aria-label') || `svg-${i}`,
-                        markup: svg.outerHTML.slice(0, 2000),
-                        width: Math.round(r.width),
-                        height: Math.round(r.height),
-                        role: role,
-                    };
-                });
-        }''')
-        except Exception as e:
-            print(f"  [scrape] SVGs extraction failed: {e}")
-            svgs = []
+        # === EXTRACT SVGs, TEXT CONTENT, META ===
+        # Batched into one page.evaluate round-trip
+        extracted = await _evaluate_batch(page, _SVGS_TEXT_META_JS, {
+            "svgs": [],
+            "text_content": "",
+            "meta": {"title": "", "description": "", "og_image": "", "favicon": ""},
+        })
+        svgs = extracted["svgs"]
+        text_content = extracted["text_content"]
+        meta = extracted["meta"]
 
         await _emit(f"Extracted {len(svgs)} SVGs")
 
-        # === EXTRACT TEXT CONTENT ===
-        try:
-            text_content = await page.evaluate('''() => {
-                return document.body.innerText.slice(0, 8000);
-            }''')
-        except Exception as e:
-            print(f"  [scrape] Text content extraction failed: {e}")
-            text_content = ""
-
-        # === EXTRACT META ===
-        try:
-            meta = await page.evaluate('''() => {
-                return {
-                    title: document.title,
-                    description: document.querySelector('meta[name="description"]')?.content || '',
-                    og_image: document.querySelector('meta[property="og:image"]')?.content || '',
-                    favicon: document.querySelector('link[rel="icon"]')?.href ||
-                             document.querySelector('link[rel="shortcut icon"]')?.href || ''
-                };
-        }''')
-        except Exception as e:
-            print(f"  [scrape] Meta extraction failed: {e}")
-            meta = {"title": "", "description": "", "og_image": "", "favicon": ""}
-
         # === EXTRACT SECTIONS (structured DOM) ===
         if _budget_left() < 5:
             print(f"  [scrape] Time budget low ({_budget_left():.1f}s) — skipping full section extraction, using screenshots only")
@@ -516,38 +630,63 @@ async def scrape_website(url: str, on_progress=None) -> dict:
         page_height = await page.evaluate("document.body.scrollHeight")
 
         # Viewport screenshot (first fold) — wrapped in try/except for crash safety
+        # PIL decode/resize/JPEG encode is CPU-bound — it runs in worker
+        # threads while the next capture is taken, and is collected at the end
         viewport_b64 = None
+        viewport_task = None
+        last_hash = None
         try:
             await page.evaluate("window.scrollTo(0, 0)")
             await page.wait_for_timeout(200)
             viewport_bytes = await page.screenshot()
-            viewport_b64, _ = screenshot_to_b64(viewport_bytes, compress=True)
+            viewport_task = asyncio.ensure_future(asyncio.to_thread(screenshot_to_b64, viewport_bytes, True))
+            last_hash = await asyncio.to_thread(perceptual_hash, viewport_bytes)
         except Exception as e:
             print(f"  [scrape] Viewport screenshot failed (browser crash?): {e}")
 
         # Viewport-scroll screenshots for chunked generation (capped at 4)
         # Wrapped in try/except — browser can crash (SEGV) on heavy pages
-        scroll_screenshots = []
+        # The y=0 chunk would repeat the viewport capture, so it is only taken
+        # when that failed. Near-duplicate captures (scrollTo clamps at the
+        # page bottom) are dropped so Claude never receives the same image twice.
+        chunk_tasks = []
         scroll_step = 900  # 1080 - 180 overlap
         max_scroll_screenshots = 4
-        y = 0
+        duplicate_threshold = 4  # differing bits out of 64
+        y = scroll_step if last_hash is not None else 0
         try:
-            while y < page_height and len(scroll_screenshots) < max_scroll_screenshots:
+            while y < page_height and len(chunk_tasks) < max_scroll_screenshots:
                 if _budget_left() < 2:
-                    print(f"  [scrape] Time budget low — stopping scroll screenshots at {len(scroll_screenshots)}")
+                    print(f"  [scrape] Time budget low — stopping scroll screenshots at {len(chunk_tasks)}")
                     break
                 await page.evaluate(f"window.scrollTo(0, {y})")
                 await page.wait_for_timeout(200)
                 chunk_bytes = await page.screenshot()
-                chunk_b64, _ = screenshot_to_b64(chunk_bytes, compress=True)
-                scroll_screenshots.append({
-                    "y": y,
-                    "b64": chunk_b64,
-                })
+                chunk_hash = await asyncio.to_thread(perceptual_hash, chunk_bytes)
+                if last_hash is not None and hash_distance(chunk_hash, last_hash) <= duplicate_threshold:
+                    print(f"  [scrape] Skipping duplicate scroll screenshot at y={y}")
+                    y += scroll_step
+                    continue
+                last_hash = chunk_hash
+                chunk_tasks.append((y, asyncio.ensure_future(
+                    asyncio.to_thread(screenshot_to_b64, chunk_bytes, True)
+                )))
                 y += scroll_step
         except Exception as e:
             print(f"  [scrape] Scroll screenshots failed (browser crash?): {e}")
 
+        if viewport_task is not None:
+            try:
+                viewport_b64, _ = await viewport_task
+            except Exception as e:
+                print(f"  [scrape] Viewport screenshot compression failed: {e}")
+        encoded = await asyncio.gather(*(task for _, task in chunk_tasks), return_exceptions=True)
+        scroll_screenshots = [
+            {"y": chunk_y, "b64": result[0]}
+            for (chunk_y, _), result in zip(chunk_tasks, encoded)
+            if not isinstance(result, BaseException)
+        ]
+
         screenshot_count = (1 if viewport_b64 else 0) + len(scroll_screenshots)
         await _emit(f"Captured {screenshot_count} screenshots")
 
@@ -555,7 +694,12 @@ async def scrape_website(url: str, on_progress=None) -> dict:
         print(f"  [scrape] Extraction finished in {_total_extraction:.1f}s "
               f"({len(sections)} sections, {len(scroll_screenshots)} scroll screenshots)")
 
-        await browser.close()
+    finally:
+        # The browser may have crashed mid-scrape; the next _get_browser relaunches it
+        try:
+            await context.close()
+        except Exception:
+            pass
 
     return {
         "url": url,
@@ -602,15 +746,7 @@ def _partial_result(url, meta=None, assets=None, theme=None, clickables=None,
 async def _safe_extract_meta(page):
     """Extract meta tags, returning defaults on failure."""
     try:
-        return await page.evaluate('''() => {
-            return {
-                title: document.title,
-                description: document.querySelector('meta[name="description"]')?.content || '',
-                og_image: document.querySelector('meta[property="og:image"]')?.content || '',
-                favicon: document.querySelector('link[rel="icon"]')?.href ||
-                         document.querySelector('link[rel="shortcut icon"]')?.href || ''
-            };
-        }''')
+        return await page.evaluate(_META_JS)
     except Exception:
         return {"title": "", "description": "", "og_image": "", "favicon": ""}
 
@@ -1951,16 +2087,16 @@ async def extract_snapshot(url: str) -> str:
 
     This bypasses AI entirely — the browser already rendered it perfectly.
     """
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/131.0.0.0 Safari/537.36"
-            ),
-        )
+    browser = await _get_browser()
+    context = await browser.new_context(
+        viewport={"width": 1920, "height": 1080},
+        user_agent=(
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/131.0.0.0 Safari/537.36"
+        ),
+    )
+    try:
         page = await context.new_page()
 
         try:
@@ -1970,7 +2106,6 @@ async def extract_snapshot(url: str) -> str:
                 await page.goto(url, wait_until="domcontentloaded", timeout=15000)
                 await page.wait_for_timeout(3000)
             except Exception as e:
-                await browser.close()
                 raise Exception(f"Failed to load {url}: {e}")
 
         # Clean up page (dismiss banners, unlock scroll, trigger lazy load)
@@ -2132,7 +2267,12 @@ async def extract_snapshot(url: str) -> str:
             return '<!DOCTYPE html>\\n' + doc.documentElement.outerHTML;
         }''', base_url)
 
-        await browser.close()
+    finally:
+        # The browser may have crashed mid-scrape; the next _get_browser relaunches it
+        try:
+            await context.close()
+        except Exception:
+            pass
 
     return snapshot_html
 
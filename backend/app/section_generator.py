@@ -25,6 +25,23 @@ def _get_client():
     return _client
 
 
+_tokens_obj = None
+_tokens_text = ""
+
+
+def _design_tokens_text(design_tokens: dict) -> str:
+    """
+    Render the design tokens block for the user prompt, once per tokens dict.
+    Every section of a clone is generated from the same dict, so the parallel
+    calls share one dump instead of re-serializing it per section.
+    """
+    global _tokens_obj, _tokens_text
+    if design_tokens is not _tokens_obj:
+        _tokens_text = json.dumps(design_tokens, separators=(",", ":"))[:6000]
+        _tokens_obj = design_tokens
+    return _tokens_text
+
+
 SECTION_SYSTEM_PROMPT = """You are a React component generator for a Next.js website clone. You generate ONE component at a time.
 
 ## CRITICAL: Shared Imports
@@ -258,7 +275,7 @@ async def generate_section(
         user_text = (
             f"Generate the `{component_name}` component (section type: {sec_type}).\n\n"
             f"DESIGN TOKENS (use these EXACT values for all styling):\n"
-            f"```json\n{json.dumps(design_tokens, indent=2)[:6000]}\n```\n\n"
+            f"```json\n{_design_tokens_text(design_tokens)}\n```\n\n"
             f"SECTION DATA:\n"
             f"```json\n{json.dumps(section_data, indent=2)[:8000]}\n```\n"
             f"{manifest_text}\n"
@@ -325,15 +342,21 @@ async def generate_section(
         }
 
 
+_FENCE = "```"
+
+
 def _strip_code_fences(text: str) -> str:
     """Remove markdown code fences from Claude output."""
     text = text.strip()
-    if text.startswith("```"):
+    # Work out both cut points first so the body is sliced only once
+    start, end = 0, len(text)
+    if text.startswith(_FENCE):
         # Remove first line (```jsx or ```typescript etc.)
-        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
-    if text.endswith("```"):
-        text = text[:-3]
-    return text.strip()
+        nl = text.find("\n")
+        start = nl + 1 if nl != -1 else 3
+    if text.endswith(_FENCE) and end - 3 >= start:
+        end -= 3
+    return text[start:end].strip()
 
 
 def _fallback_component(name: str, sec_type: str) -> str:
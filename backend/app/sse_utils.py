@@ -1,7 +1,58 @@
-import json
+import asyncio
+from typing import AsyncIterator
+
+import orjson
 
 
 def sse_event(event_type: str, data: dict) -> str:
     """Format a Server-Sent Event string."""
     payload = {"type": event_type, **data}
-    return f"data: {json.dumps(payload)}\n\n"
+    return f"data: {orjson.dumps(payload).decode()}\n\n"
+
+
+_END = object()
+
+
+async def coalesce_sse(events: AsyncIterator[str], max_bytes: int = 8192) -> AsyncIterator[bytes]:
+    """
+    Encode SSE events to bytes and merge bursts into single writes.
+
+    The source is drained into an unbounded queue by a background task.
+    Whatever has piled up while the previous chunk was being sent is
+    joined (up to max_bytes) into one write. Nothing waits for more events,
+    so a lone event is flushed immediately.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def _pump():
+        try:
+            async for event in events:
+                queue.put_nowait(event)
+        except Exception as e:
+            queue.put_nowait(e)
+        finally:
+            queue.put_nowait(_END)
+
+    pump = asyncio.create_task(_pump())
+    try:
+        finished = False
+        while not finished:
+            item = await queue.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+
+            buf = bytearray(item.encode("utf-8"))
+            while len(buf) < max_bytes and not queue.empty():
+                item = queue.get_nowait()
+                if item is _END:
+                    finished = True
+                    break
+                if isinstance(item, Exception):
+                    yield bytes(buf)
+                    raise item
+                buf += item.encode("utf-8")
+            yield bytes(buf)
+    finally:
+        pump.cancel()
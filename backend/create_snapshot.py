@@ -1,12 +1,15 @@
 """
-One-time script: creates a Daytona snapshot with a Next.js app pre-installed via bun.
+One-time script: creates a Daytona snapshot with the Next.js app that
+create_react_boilerplate_sandbox() would otherwise scaffold on every create:
 
-    bun create next-app@latest clone-app --yes
-    cd clone-app && bun add framer-motion lucide-react react-icons
+    bun installed at BUN_BIN
+    bun create next-app@latest PROJECT_PATH --typescript --tailwind --eslint --app --use-bun --yes
+    bun add EXTRA_PACKAGES
 
-That's the whole snapshot. On boot, just `bun dev` and you're live.
+Sandboxes created from it skip straight to starting the dev server.
 
 Run once:  python3 create_snapshot.py
+Then set:  SANDBOX_SNAPSHOT=wc-nextjs-app-router
 """
 
 import os
@@ -23,6 +26,8 @@ if not api_key:
 
 from daytona_sdk import Daytona, DaytonaConfig, CreateSnapshotParams, Image, Resources
 
+from app.sandbox import BUN_BIN, EXTRA_PACKAGES, PROJECT_PATH
+
 SNAPSHOT_NAME = "wc-nextjs-app-router"
 
 daytona = Daytona(DaytonaConfig(api_key=api_key, target="us"))
@@ -36,22 +41,29 @@ try:
 except Exception:
     pass
 
+project_parent, project_name = PROJECT_PATH.rsplit("/", 1)
+bun_install_dir = BUN_BIN.rsplit("/bin/", 1)[0]
+
 image = (
     Image.base("node:20-slim")
     .run_commands(
-        "apt-get update && apt-get install -y git curl && rm -rf /var/lib/apt/lists/*",
-        "npm install -g bun",
+        "apt-get update && apt-get install -y git curl unzip && rm -rf /var/lib/apt/lists/*",
+    )
+    .env({"CI": "true", "BUN_INSTALL": bun_install_dir})
+    .run_commands(
+        # Same bun location the sandbox code calls (BUN_BIN)
+        "curl -fsSL https://bun.sh/install | bash",
     )
-    .workdir("/home/daytona")
-    .env({"CI": "true"})
+    .workdir(project_parent)
     .run_commands(
-        # Create Next.js app with all defaults (TS, Tailwind, App Router, ESLint)
-        "bun create next-app@latest clone-app --yes 2>&1",
+        # Same scaffold as create_react_boilerplate_sandbox (TS, Tailwind, App Router)
+        f"{BUN_BIN} create next-app@latest {project_name} "
+        "--typescript --tailwind --eslint --app --use-bun --yes 2>&1",
     )
-    .workdir("/home/daytona/clone-app")
+    .workdir(PROJECT_PATH)
     .run_commands(
-        # Add animation/icon libs
-        "bun add framer-motion lucide-react react-icons 2>&1",
+        f"{BUN_BIN} install 2>&1",
+        f"{BUN_BIN} add {' '.join(EXTRA_PACKAGES)} 2>&1",
         # Verify
         "ls -la",
         "cat package.json",
@@ -59,7 +71,7 @@ image = (
 )
 
 print(f"Creating snapshot '{SNAPSHOT_NAME}'...")
-print("bun create next-app@latest clone-app --yes + extras\n")
+print(f"bun create next-app@latest {PROJECT_PATH} + {len(EXTRA_PACKAGES)} extra packages\n")
 
 snapshot = daytona.snapshot.create(
     CreateSnapshotParams(
@@ -72,3 +84,4 @@ snapshot = daytona.snapshot.create(
 )
 
 print(f"\nSnapshot: {snapshot.name} (state: {snapshot.state})")
+print(f"Set SANDBOX_SNAPSHOT={snapshot.name} to create sandboxes from it.")